@@ -0,0 +1,120 @@
+# askpass.py
+import os
+import secrets
+import socket
+import struct
+import sys
+import threading
+import time
+
+HELPER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gemterm_askpass.py")
+TOKEN_TTL = 120.0  # Seconds an unused token stays valid (e.g. when a pooled master made it unnecessary)
+
+# Reply status lines understood by gemterm_askpass.py
+REPLY_SECRET = b"secret\n"  # Followed by the password
+REPLY_ASK = b"ask\n"  # Not a password prompt: the helper asks on the session's terminal
+
+
+def is_password_prompt(prompt):
+    """True for ssh's password and keyboard-interactive password prompts.
+
+    Host key confirmations and key passphrase prompts also come through
+    SSH_ASKPASS and must not be answered with the password.
+    """
+    prompt = prompt.lower()
+    return "password" in prompt and "passphrase" not in prompt
+
+
+class AskpassBroker:
+    """Hands SSH passwords to ssh in memory through SSH_ASKPASS.
+
+    Each password session gets a random one-shot token in its environment.
+    ssh runs gemterm_askpass.py, which sends the token and prompt over an
+    abstract unix socket (no file is created). The broker checks that the
+    peer runs as our uid and answers the first password prompt with the
+    password, which it then forgets. Any other prompt for a valid token is
+    sent back to the helper to ask on the session's terminal.
+    """
+
+    def __init__(self):
+        self.address = f"\0gemterm-askpass-{os.getpid()}-{secrets.token_hex(8)}"
+        self.tokens = {}  # token -> [secret or None once used, expires]
+        self.lock = threading.Lock()
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.bind(self.address)
+        self.sock.listen(16)
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+
+    def issue(self, secret):
+        token = secrets.token_urlsafe(24)
+        with self.lock:
+            self.tokens[token] = [secret, time.monotonic() + TOKEN_TTL]
+        return token
+
+    def revoke(self, token):
+        if token:
+            with self.lock:
+                self.tokens.pop(token, None)
+
+    def environment(self, token):
+        """Environment variables that make ssh ask the broker instead of the terminal."""
+        return {'SSH_ASKPASS': HELPER, 'SSH_ASKPASS_REQUIRE': "force",
+                'GEMTERM_ASKPASS_SOCKET': self.address[1:], 'GEMTERM_ASKPASS_TOKEN': token}
+
+    def _reply(self, token, prompt):
+        """Returns the reply for prompt, or None if the token is unknown or its password was used."""
+        now = time.monotonic()
+        with self.lock:
+            for stale in [t for t, (_, expires) in self.tokens.items() if expires < now]:
+                del self.tokens[stale]
+            entry = self.tokens.get(token)
+            if entry is None:
+                return None
+            if not is_password_prompt(prompt):
+                return REPLY_ASK
+            secret, entry[0] = entry[0], None
+        # A second password prompt means the password was wrong: fail instead of retrying
+        return REPLY_SECRET + secret.encode() if secret is not None else None
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return  # Closed
+            with conn:
+                try:
+                    self._answer(conn)
+                except OSError:
+                    pass
+
+    def _answer(self, conn):
+        conn.settimeout(2.0)
+        creds = conn.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize('3i'))
+        _, uid, _ = struct.unpack('3i', creds)
+        if uid != os.getuid():
+            return
+        request = b""
+        while len(request) < 16384:  # Host key prompts span several lines; the helper shuts down its side
+            chunk = conn.recv(4096)
+            if not chunk:
+                break
+            request += chunk
+        token, _, prompt = request.decode(errors='replace').partition("\n")
+        reply = self._reply(token, prompt.rstrip("\n"))
+        if reply is not None:
+            conn.sendall(reply)
+
+    def close(self):
+        with self.lock:
+            self.tokens.clear()
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+
+def helper_usable():
+    return sys.platform.startswith("linux") and os.access(HELPER, os.X_OK)
@@ -0,0 +1,314 @@
+# benchmarks/bench.py
+"""Headless benchmarks for gemTerm's hot paths.
+
+Runs TabbedInterface under Xvfb (started here unless DISPLAY is already set)
+with stub ssh/rdesktop/vncviewer binaries and a throwaway HOME, and reports:
+
+  first_paint_s       TabbedInterface() until the window shell is drawn
+  startup_ready_s     TabbedInterface() until its N stored connections are loaded (finish_startup)
+  load_connections_s  connections.load_connections() alone
+  launch_embedded_s   create_xterm_process() until the xterm window is embedded (mean/max)
+  launch_batch_s      launch_connections() of --batch connections until all are embedded
+  resize_events_per_s on_tab_resize() throughput for a burst of Configure events
+  resize_x_calls      X resize requests actually sent for that burst
+  cat_native_mb_per_s `cat` of a --cat-mb file through the in-process terminal (term_view)
+  cat_xterm_mb_per_s  the same file through a standalone xterm
+  idle_cpu_percent    CPU used by the Tk loop while idle with the test tabs open
+  on_closing_s        on_closing() until the window is destroyed
+
+Usage:
+  python benchmarks/bench.py --output results.json
+  python benchmarks/bench.py --save-baseline benchmarks/baseline.json
+  python benchmarks/bench.py --baseline benchmarks/baseline.json --threshold 0.25
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Metrics where a larger number is better; everything else is a duration or a cost
+HIGHER_IS_BETTER = {"resize_events_per_s", "cat_native_mb_per_s", "cat_xterm_mb_per_s"}
+
+STUB_SCRIPT = """#!/bin/sh
+echo "stub $(basename "$0") $*"
+exec sleep 3600
+"""
+
+
+class FakeConfigureEvent:
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+
+
+def start_xvfb():
+    if os.environ.get("DISPLAY"):
+        return None
+    if not shutil.which("Xvfb"):
+        sys.exit("DISPLAY is not set and Xvfb was not found")
+    for number in range(99, 120):
+        if not os.path.exists(f"/tmp/.X11-unix/X{number}"):
+            break
+    xvfb = subprocess.Popen(["Xvfb", f":{number}", "-screen", "0", "1280x1024x24", "-nolisten", "tcp"],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 10
+    while not os.path.exists(f"/tmp/.X11-unix/X{number}"):
+        if time.monotonic() > deadline or xvfb.poll() is not None:
+            sys.exit("Xvfb did not start")
+        time.sleep(0.05)
+    os.environ["DISPLAY"] = f":{number}"
+    return xvfb
+
+
+def prepare_environment(work_dir, args):
+    """Points HOME at work_dir, writes the config and puts stub binaries first on PATH."""
+    home = os.path.join(work_dir, "home")
+    config_dir = os.path.join(home, ".config", "gemTerm")
+    os.makedirs(config_dir)
+    with open(os.path.join(config_dir, "gemterm_config.json"), "w") as f:
+        json.dump({"window_size": "1024x768", "default_font": ["Monospace", 10],
+                   "xterm_pool_size": args.xterm_pool, "ssh_multiplexing": False}, f)
+    bin_dir = os.path.join(work_dir, "bin")
+    os.makedirs(bin_dir)
+    for name in ("ssh", "rdesktop", "vncviewer"):
+        path = os.path.join(bin_dir, name)
+        with open(path, "w") as f:
+            f.write(STUB_SCRIPT)
+        os.chmod(path, 0o755)
+    os.environ["HOME"] = home
+    os.environ["PATH"] = bin_dir + os.pathsep + os.environ.get("PATH", "")
+
+
+def seed_connections(count):
+    import connections
+    types = ("SSH", "RDP", "VNC")
+    items = ((f"bench{i:08x}", {'label': f"host-{i:06d}", 'type': types[i % 3], 'host': f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}",
+                                'auth.type': "", 'auth.username': "bench", 'auth.password': "", 'auth.key_file': "",
+                                'group': f"site{i % 10}/rack{i % 7}"})
+             for i in range(count))
+    connections.get_store().save_many(items)
+
+
+def pump_until(app, condition, timeout):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        app.update()
+        time.sleep(0.001)
+    return True
+
+
+def write_cat_file(path, megabytes):
+    line = b"%08d the quick brown fox jumps over the lazy dog \x1b[1;32m0123456789\x1b[0m abcdefghijklmnop\n"
+    with open(path, "wb") as f:
+        written = i = 0
+        while written < megabytes * 1_000_000:
+            chunk = line % i
+            f.write(chunk)
+            written += len(chunk)
+            i += 1
+    return written
+
+
+def bench_cat(app, path, size, timeout):
+    """Returns (native MB/s, xterm MB/s) for cat-ing path; None where it didn't finish."""
+    import tkinter
+    import term_view
+    native = None
+    if term_view.available():  # The native backend needs setsid
+        window = tkinter.Toplevel(app)
+        window.geometry("1000x700")
+        view = term_view.TerminalView(window, ("Monospace", 10))
+        view.pack(fill="both", expand=True)
+        app.update()
+        view.resize(1000, 700)
+        argv, popen_kwargs = view.command(["cat", path])
+        start = time.perf_counter()
+        process = subprocess.Popen(argv, **popen_kwargs)
+        view.attach(process)
+        if pump_until(app, lambda: not view.reading, timeout):
+            view.redraw()  # Count the final frame
+            native = size / 1e6 / (time.perf_counter() - start)
+        process.wait()
+        view.close()
+        window.destroy()
+
+    xterm = None
+    start = time.perf_counter()
+    try:
+        subprocess.run(["xterm", "-geometry", "120x50", "-e", "cat", path], timeout=timeout, check=True)
+        xterm = size / 1e6 / (time.perf_counter() - start)
+    except (OSError, subprocess.SubprocessError):
+        pass
+    return native, xterm
+
+
+def run(args):
+    import connections
+    import main
+
+    results = {}
+    seed_connections(args.connections)
+    connections._store = None  # Reopen so the load below is measured cold
+
+    start = time.perf_counter()
+    loaded = connections.load_connections()
+    results["load_connections_s"] = time.perf_counter() - start
+    connections._store = None
+
+    start = time.perf_counter()
+    app = main.TabbedInterface()
+    app.update_idletasks()
+    results["first_paint_s"] = time.perf_counter() - start
+    if pump_until(app, lambda: app.startup_complete, args.embed_timeout):
+        results["startup_ready_s"] = time.perf_counter() - start
+
+    # Launch-to-embedded latency
+    latencies = []
+    frames = []
+    for unique_id in list(loaded)[:args.tabs]:
+        info = loaded[unique_id]
+        if info['type'] != "SSH":
+            continue
+        start = time.perf_counter()
+        session = app.create_xterm_process(info['label'], "", unique_id, info)
+        if session is None:
+            continue
+        if pump_until(app, lambda: session.session_id in app.x11.window_ids, args.embed_timeout):
+            latencies.append(time.perf_counter() - start)
+        frames.append(session.frame)
+    if latencies:
+        results["launch_embedded_mean_s"] = sum(latencies) / len(latencies)
+        results["launch_embedded_max_s"] = max(latencies)
+    results["tabs_embedded"] = len(latencies)
+
+    # Batch launch through the spawn pipeline, as for a multi-select open
+    batch = [unique_id for unique_id in list(loaded)[args.tabs:args.tabs + args.batch] if loaded[unique_id]['type'] == "SSH"]
+    if batch:
+        start = time.perf_counter()
+        launched = app.launch_connections(batch)
+        if pump_until(app, lambda: all(session.session_id in app.x11.window_ids for session in launched), args.embed_timeout):
+            results["launch_batch_s"] = time.perf_counter() - start
+        frames.extend(session.frame for session in launched)
+
+    # Resize throughput for one burst of Configure events on every open tab
+    x_calls = [0]
+    original_resize = app.x11.resize
+
+    def counting_resize(*resize_args):
+        x_calls[0] += 1
+        return original_resize(*resize_args)
+
+    app.x11.resize = counting_resize
+    start = time.perf_counter()
+    for i in range(args.resize_events):
+        for frame in frames:
+            app.on_tab_resize(frame, FakeConfigureEvent(600 + i % 200, 400 + i % 150))
+    elapsed = time.perf_counter() - start
+    pump_until(app, lambda: app.resize_scheduler.after_id is None, 2.0)
+    results["resize_events_per_s"] = args.resize_events * max(len(frames), 1) / elapsed if elapsed else 0.0
+    results["resize_x_calls"] = x_calls[0]
+    app.x11.resize = original_resize
+
+    # Terminal throughput: native backend vs xterm
+    if args.cat_mb > 0:
+        cat_path = os.path.join(os.environ["HOME"], "cat.txt")
+        size = write_cat_file(cat_path, args.cat_mb)
+        native, xterm = bench_cat(app, cat_path, size, args.embed_timeout * 6)
+        if native is not None:
+            results["cat_native_mb_per_s"] = native
+        if xterm is not None:
+            results["cat_xterm_mb_per_s"] = xterm
+
+    # Idle CPU with the tabs open: let mainloop sleep in select for a while
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    app.after(int(args.idle_seconds * 1000), app.quit)
+    app.mainloop()
+    results["idle_cpu_percent"] = 100.0 * (time.process_time() - cpu_start) / (time.perf_counter() - wall_start)
+
+    # Shutdown: on_closing hides the window and finishes asynchronously
+    start = time.perf_counter()
+    app.on_closing()
+    app.mainloop()
+    results["on_closing_s"] = time.perf_counter() - start
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Returns a list of (metric, baseline, current) that regressed by more than threshold."""
+    regressions = []
+    for metric, old in baseline.get("results", {}).items():
+        new = results.get(metric)
+        if not isinstance(old, (int, float)) or not isinstance(new, (int, float)) or old == 0:
+            continue
+        change = (old - new) / old if metric in HIGHER_IS_BETTER else (new - old) / old
+        if change > threshold:
+            regressions.append((metric, old, new))
+    return regressions
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Benchmark gemTerm's launch, resize, load and shutdown paths.")
+    parser.add_argument("--connections", type=int, default=5000, help="stored connections to seed")
+    parser.add_argument("--tabs", type=int, default=10, help="connections to launch")
+    parser.add_argument("--batch", type=int, default=25, help="connections to open at once for launch_batch_s")
+    parser.add_argument("--resize-events", type=int, default=500, help="Configure events per tab")
+    parser.add_argument("--cat-mb", type=int, default=20, help="file size for the terminal throughput test (0 skips it)")
+    parser.add_argument("--idle-seconds", type=float, default=3.0)
+    parser.add_argument("--embed-timeout", type=float, default=10.0)
+    parser.add_argument("--xterm-pool", type=int, default=0, help="xterm_pool_size to benchmark with")
+    parser.add_argument("--output", help="write results JSON here (default: stdout)")
+    parser.add_argument("--baseline", help="compare against this results JSON")
+    parser.add_argument("--save-baseline", help="also write results to this path")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed relative regression")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="gemterm-bench-")
+    xvfb = None
+    try:
+        prepare_environment(work_dir, args)
+        xvfb = start_xvfb()
+        sys.path.insert(0, REPO_DIR)
+        results = run(args)
+    finally:
+        if xvfb:
+            xvfb.terminate()
+            xvfb.wait()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = {
+        "meta": {"python": platform.python_version(), "platform": platform.platform(),
+                 "connections": args.connections, "tabs": args.tabs, "resize_events": args.resize_events,
+                 "xterm_pool": args.xterm_pool, "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")},
+        "results": results,
+    }
+    text = json.dumps(report, indent=4)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            f.write(text + "\n")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for metric, old, new in regressions:
+            print(f"REGRESSION {metric}: {old:.6g} -> {new:.6g}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -1,48 +1,180 @@
 # config.py
+import atexit
 import json
 import os
+import tempfile
+import threading
+import time
 import tkinter as tk
+import tracing
 from tkinter import ttk
 from tkinter import font as tkFont
 
 CONFIG_DIR = os.path.expanduser("~/.config/gemTerm")
 CONFIG_FILE = os.path.join(CONFIG_DIR, "gemterm_config.json")
 
+DEFAULTS = {"window_size": "800x600", "default_font": ["Monospace", 10]}
+WRITE_DELAY = 0.5  # Seconds to coalesce saves before writing
+STAT_INTERVAL = 1.0  # Seconds between checks for changes made on disk
+
 def _ensure_config_dir_exists():
     if not os.path.exists(CONFIG_DIR):
         os.makedirs(CONFIG_DIR)
 
-def load_config():
-    _ensure_config_dir_exists()
-    if os.path.exists(CONFIG_FILE):
-        with open(CONFIG_FILE, 'r') as f:
+class Config:
+    """Config file cached in memory with debounced, atomic write-behind.
+
+    The file is read once; later reads come from memory unless the file's
+    mtime or size changed on disk. Saves are coalesced for WRITE_DELAY seconds
+    and then written to a temporary file, fsynced and renamed into place.
+    """
+
+    def __init__(self, path, defaults=DEFAULTS):
+        self.path = path
+        self.defaults = defaults
+        self.data = None
+        self.signature = None  # (mtime_ns, size) of the file we last read or wrote
+        self.last_check = 0.0
+        self.dirty = False
+        self.timer = None
+        self.lock = threading.RLock()
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+            return (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            return None
+
+    def _read(self):
+        with tracing.span("config.read"):
+            self._read_file()
+
+    def _read_file(self):
+        self.signature = self._stat()
+        self.last_check = time.monotonic()
+        if self.signature is None:
+            self.data = dict(self.defaults)
+            return
+        with open(self.path, 'r') as f:
             try:
-                return json.load(f)
+                self.data = json.load(f)
             except json.JSONDecodeError:
                 print("Warning: Error decoding config file. Using defaults.")
-                return {"window_size": "800x600", "default_font": ["Monospace", 10]}
-    return {"window_size": "800x600", "default_font": ["Monospace", 10]}
+                self.data = dict(self.defaults)
+
+    def _current(self):
+        with self.lock:
+            if self.data is None:
+                self._read()
+            elif not self.dirty and time.monotonic() - self.last_check > STAT_INTERVAL:
+                self.last_check = time.monotonic()
+                if self._stat() != self.signature:
+                    self._read()
+            return self.data
+
+    def get(self, key, default=None):
+        return self._current().get(key, self.defaults.get(key, default))
+
+    def get_str(self, key, default=""):
+        value = self.get(key)
+        return default if value is None else str(value)
+
+    def get_int(self, key, default=0):
+        try:
+            return int(self.get(key, default))
+        except (TypeError, ValueError):
+            return default
+
+    def get_float(self, key, default=0.0):
+        try:
+            return float(self.get(key, default))
+        except (TypeError, ValueError):
+            return default
+
+    def get_bool(self, key, default=False):
+        return bool(self.get(key, default))
+
+    def get_list(self, key, default=None):
+        value = self.get(key, default)
+        return list(value) if value is not None else []
+
+    def set(self, key, value):
+        self.update({key: value})
+
+    def update(self, values):
+        with self.lock:
+            self._current().update(values)
+            self.dirty = True
+            if self.timer is None:
+                self.timer = threading.Timer(WRITE_DELAY, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self._current())
+
+    def replace(self, config_data):
+        with self.lock:
+            self.data = dict(config_data)
+            self.dirty = True
+        self.flush()
+
+    def flush(self):
+        """Writes pending changes now: tmp file + fsync + rename."""
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            if not self.dirty:
+                return
+            _ensure_config_dir_exists()
+            write_started = tracing.now_ns()
+            fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(self.path)}.", dir=os.path.dirname(self.path))
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(self.data, f, indent=4)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.path)
+            except Exception as e:
+                print(f"Warning: Error writing config file: {e}")
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                return
+            tracing.record("config.write", write_started, tracing.now_ns())
+            self.dirty = False
+            self.signature = self._stat()
+            self.last_check = time.monotonic()
+
+settings = Config(CONFIG_FILE)
+atexit.register(settings.flush)
+
+def load_config():
+    return settings.snapshot()
 
 def save_config(config_data):
-    _ensure_config_dir_exists()
-    with open(CONFIG_FILE, 'w') as f:
-        json.dump(config_data, f, indent=4)
+    settings.replace(config_data)
+
+def flush():
+    settings.flush()
 
 def get_window_size():
-    return load_config().get("window_size", "800x600")
+    return settings.get_str("window_size")
 
 def save_window_size(width, height):
-    config_data = load_config()
-    config_data["window_size"] = f"{width}x{height}"
-    save_config(config_data)
+    settings.set("window_size", f"{width}x{height}")
 
 def get_default_font():
-    return load_config().get("default_font", ["Monospace", 10])
+    return settings.get_list("default_font")
 
 def save_default_font(font_tuple):
-    config_data = load_config()
-    config_data["default_font"] = list(font_tuple)
-    save_config(config_data)
+    settings.set("default_font", list(font_tuple))
+
+def get_shutdown_grace():
+    """Seconds to wait after SIGTERM before sessions are force-killed."""
+    return settings.get_float("shutdown_grace_seconds", 2.0)
 
 def open_settings(root):
     """Opens the settings window."""
@@ -81,4 +213,20 @@ def open_settings(root):
         print(f"Default font set to: {new_font}") # Placeholder for applying font to UI
 
     apply_button = ttk.Button(settings_window, text="Apply", command=apply_font)
-    apply_button.grid(row=2, column=0, columnspan=2, padx=5, pady=10)
\ No newline at end of file
+    apply_button.grid(row=2, column=0, columnspan=2, padx=5, pady=10)
+
+    if hasattr(root, 'export_connections'):
+        export_button = ttk.Button(settings_window, text="Export Connections...", command=root.export_connections)
+        export_button.grid(row=3, column=0, columnspan=2, padx=5, pady=5)
+
+    if hasattr(root, 'open_ssh_masters'):
+        ssh_button = ttk.Button(settings_window, text="SSH Masters...", command=root.open_ssh_masters)
+        ssh_button.grid(row=4, column=0, columnspan=2, padx=5, pady=5)
+
+    if hasattr(root, 'open_debug_panel'):
+        debug_button = ttk.Button(settings_window, text="Debug Panel...", command=root.open_debug_panel)
+        debug_button.grid(row=6, column=0, columnspan=2, padx=5, pady=5)
+
+    if hasattr(root, 'launch_latency_summary'):
+        latency_label = ttk.Label(settings_window, text=f"Launch latency: {root.launch_latency_summary()}")
+        latency_label.grid(row=5, column=0, columnspan=2, padx=5, pady=5, sticky=tk.W)
\ No newline at end of file
@@ -0,0 +1,331 @@
+# connection_store.py
+import json
+import os
+import sqlite3
+import threading
+
+FLAT_FILE_SUFFIX = ".gemTerm"
+
+
+def parse_flat_file(filepath):
+    connection_info = {}
+    with open(filepath, 'r') as f:
+        for line in f:
+            if '=' in line:
+                key, value = line.strip().split('=', 1)
+                connection_info[key] = value
+    return connection_info
+
+
+def write_flat_file(filepath, connection_data):
+    with open(filepath, 'w') as f:
+        for key, value in connection_data.items():
+            f.write(f"{key}={value}\n")
+
+
+def iter_flat_files(directory):
+    """Yields (unique_id, connection_info) for every .gemTerm file, one file at a time."""
+    if not os.path.isdir(directory):
+        return
+    with os.scandir(directory) as it:
+        for entry in it:
+            if not entry.name.endswith(FLAT_FILE_SUFFIX):
+                continue
+            unique_id = entry.name[:-len(FLAT_FILE_SUFFIX)]
+            try:
+                connection_info = parse_flat_file(entry.path)
+            except Exception as e:
+                print(f"Error loading connection from {entry.name}: {e}")
+                continue
+            if 'label' in connection_info:
+                yield unique_id, connection_info
+
+
+def _batched(iterable, batch_size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def file_signature(stat_result):
+    return (stat_result.st_mtime_ns, stat_result.st_size)
+
+
+def scan_flat_files(directory):
+    """Returns {file name: (mtime_ns, size)} for the .gemTerm files in directory, without reading them."""
+    signatures = {}
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                if entry.name.endswith(FLAT_FILE_SUFFIX):
+                    try:
+                        signatures[entry.name] = file_signature(entry.stat())
+                    except FileNotFoundError:
+                        pass
+    except FileNotFoundError:
+        pass
+    return signatures
+
+
+def read_flat_file_changes(directory, names, signatures):
+    """Re-reads the named .gemTerm files whose signature differs from signatures.
+
+    signatures is updated in place. Returns (upserts, removed, changed, gone):
+    (unique_id, connection_info) pairs to save, unique_ids to delete (the
+    file is gone or no longer has a label), and the signature entries that
+    changed or disappeared. A file that fails to parse keeps its new
+    signature, so it isn't re-read until it changes again.
+    """
+    upserts, removed = [], []
+    changed, gone = {}, []
+    for name in names:
+        unique_id = name[:-len(FLAT_FILE_SUFFIX)]
+        path = os.path.join(directory, name)
+        try:
+            signature = file_signature(os.stat(path))
+        except FileNotFoundError:
+            if signatures.pop(name, None) is not None:
+                gone.append(name)
+                removed.append(unique_id)
+            continue
+        if signatures.get(name) == signature:
+            continue  # Already applied, e.g. a file gemTerm wrote itself
+        signatures[name] = changed[name] = signature
+        try:
+            connection_info = parse_flat_file(path)
+        except Exception as e:
+            print(f"Error loading connection from {name}: {e}")
+            continue
+        if 'label' in connection_info:
+            upserts.append((unique_id, connection_info))
+        else:
+            removed.append(unique_id)
+    return upserts, removed, changed, gone
+
+
+class FlatFileConnectionStore:
+    """One key=value .gemTerm file per connection (the original format)."""
+
+    file_backed = True  # The watched .gemTerm files are the store itself
+
+    # Signature caches are in memory only (every start re-reads the files anyway)
+    # and shared by all handles on a directory, so files written by any thread's
+    # handle, e.g. a bulk import, are recognised by the watcher as already applied
+    _signatures = {}  # directory -> {file name: (mtime_ns, size)}
+    _seeded = set()  # Directories whose cache holds a full scan
+    _signatures_lock = threading.Lock()
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(self.directory, exist_ok=True)
+        with self._signatures_lock:
+            self.signatures = self._signatures.setdefault(os.path.abspath(directory), {})
+
+    def _record(self, unique_id):
+        name = f"{unique_id}{FLAT_FILE_SUFFIX}"
+        try:
+            signature = file_signature(os.stat(self._path(unique_id)))
+        except FileNotFoundError:
+            signature = None
+        with self._signatures_lock:
+            if signature is None:
+                self.signatures.pop(name, None)
+            else:
+                self.signatures[name] = signature
+
+    def _path(self, unique_id):
+        return os.path.join(self.directory, f"{unique_id}{FLAT_FILE_SUFFIX}")
+
+    def load_all(self):
+        return dict(iter_flat_files(self.directory))
+
+    def get(self, unique_id):
+        try:
+            return parse_flat_file(self._path(unique_id))
+        except FileNotFoundError:
+            return None
+
+    def save(self, unique_id, connection_data):
+        write_flat_file(self._path(unique_id), connection_data)
+        self._record(unique_id)
+
+    def save_many(self, items, batch_size=500):
+        count = 0
+        for unique_id, connection_data in items:
+            self.save(unique_id, connection_data)
+            count += 1
+        return count
+
+    def delete(self, unique_id):
+        os.remove(self._path(unique_id))
+        self._record(unique_id)
+
+    def page(self, offset=0, limit=100):
+        items = sorted(self.load_all().items(), key=lambda item: item[1].get('label', ''))
+        return items[offset:offset + limit]
+
+    def count(self):
+        return sum(1 for _ in iter_flat_files(self.directory))
+
+    def migrate_flat_files(self, directory):
+        return 0
+
+    def file_signatures(self):
+        """Returns the live signature cache shared with this store's writes, or None before the first scan."""
+        return self.signatures if os.path.abspath(self.directory) in self._seeded else None
+
+    def update_file_signatures(self, changed, removed=()):
+        with self._signatures_lock:
+            self.signatures.update(changed)
+            for name in removed:
+                self.signatures.pop(name, None)
+            self._seeded.add(os.path.abspath(self.directory))
+
+    def export_flat_files(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        count = 0
+        for unique_id, connection_data in iter_flat_files(self.directory):
+            write_flat_file(os.path.join(directory, f"{unique_id}{FLAT_FILE_SUFFIX}"), connection_data)
+            count += 1
+        return count
+
+    def close(self):
+        pass
+
+
+class SQLiteConnectionStore:
+    """Single-file connection store with indexes on label, host and type.
+
+    The full connection dict is kept as JSON in the data column; the indexed
+    columns are copies used for lookups and ordering. The flat_files table
+    remembers the mtime and size of each watched .gemTerm file, so a restart
+    only re-parses files that changed while gemTerm wasn't running.
+    """
+
+    file_backed = False
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.db = sqlite3.connect(db_path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        with self.db:
+            self.db.execute("""CREATE TABLE IF NOT EXISTS connections (
+                unique_id TEXT PRIMARY KEY,
+                label TEXT NOT NULL,
+                type TEXT,
+                host TEXT,
+                username TEXT,
+                data TEXT NOT NULL
+            )""")
+            self.db.execute("CREATE INDEX IF NOT EXISTS idx_connections_label ON connections(label)")
+            self.db.execute("CREATE INDEX IF NOT EXISTS idx_connections_host ON connections(host)")
+            self.db.execute("CREATE INDEX IF NOT EXISTS idx_connections_type ON connections(type)")
+            self.db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            self.db.execute("CREATE TABLE IF NOT EXISTS flat_files (name TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER)")
+
+    @staticmethod
+    def _row(unique_id, connection_data):
+        return (unique_id, connection_data.get('label', ''), connection_data.get('type', ''),
+                connection_data.get('host', ''), connection_data.get('auth.username', ''),
+                json.dumps(connection_data))
+
+    def get_meta(self, key, default=None):
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        with self.db:
+            self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def load_all(self):
+        return {unique_id: json.loads(data) for unique_id, data in self.db.execute("SELECT unique_id, data FROM connections")}
+
+    def get(self, unique_id):
+        row = self.db.execute("SELECT data FROM connections WHERE unique_id = ?", (unique_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save(self, unique_id, connection_data):
+        with self.db:
+            self.db.execute("INSERT OR REPLACE INTO connections VALUES (?, ?, ?, ?, ?, ?)", self._row(unique_id, connection_data))
+
+    def save_many(self, items, batch_size=500):
+        """Writes (unique_id, connection_data) pairs, one transaction per batch."""
+        count = 0
+        for batch in _batched(items, batch_size):
+            with self.db:
+                self.db.executemany("INSERT OR REPLACE INTO connections VALUES (?, ?, ?, ?, ?, ?)",
+                                    [self._row(unique_id, data) for unique_id, data in batch])
+            count += len(batch)
+        return count
+
+    def delete(self, unique_id):
+        with self.db:
+            self.db.execute("DELETE FROM connections WHERE unique_id = ?", (unique_id,))
+
+    def page(self, offset=0, limit=100):
+        rows = self.db.execute("SELECT unique_id, data FROM connections ORDER BY label LIMIT ? OFFSET ?", (limit, offset))
+        return [(unique_id, json.loads(data)) for unique_id, data in rows]
+
+    def count(self):
+        return self.db.execute("SELECT COUNT(*) FROM connections").fetchone()[0]
+
+    def migrate_flat_files(self, directory):
+        """Imports .gemTerm files added or changed since the last start; returns the number imported.
+
+        The first call imports every file. Later calls compare each file's
+        (mtime, size) with the flat_files table and only parse files that
+        changed; connections whose file was deleted, or lost its label, are
+        removed. Runs on every start, whether or not the directory is watched.
+        """
+        if not self.get_meta("flat_files_migrated"):
+            count = self.save_many(iter_flat_files(directory))
+            self.update_file_signatures(scan_flat_files(directory))
+            self.set_meta("flat_files_migrated", "1")
+            return count
+        signatures = self.file_signatures()
+        current = scan_flat_files(directory)
+        if signatures is None:
+            # Migrated before signatures were kept: the files were imported then,
+            # and re-importing them now could overwrite later edits
+            self.update_file_signatures(current)
+            return 0
+        names = [name for name, signature in current.items() if signatures.get(name) != signature]
+        names += [name for name in signatures if name not in current]
+        if not names:
+            return 0
+        upserts, removed, changed, gone = read_flat_file_changes(directory, names, signatures)
+        count = self.save_many(upserts)
+        for unique_id in removed:
+            self.delete(unique_id)
+        self.update_file_signatures(changed, gone)
+        return count
+
+    def file_signatures(self):
+        """Returns {file name: (mtime_ns, size)}, or None if no directory scan was ever recorded."""
+        if not self.get_meta("flat_file_signatures"):
+            return None
+        return {name: (mtime_ns, size) for name, mtime_ns, size in self.db.execute("SELECT name, mtime_ns, size FROM flat_files")}
+
+    def update_file_signatures(self, changed, removed=()):
+        with self.db:
+            self.db.executemany("INSERT OR REPLACE INTO flat_files VALUES (?, ?, ?)",
+                                [(name, mtime_ns, size) for name, (mtime_ns, size) in changed.items()])
+            self.db.executemany("DELETE FROM flat_files WHERE name = ?", [(name,) for name in removed])
+            self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('flat_file_signatures', '1')")
+
+    def export_flat_files(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        count = 0
+        for unique_id, data in self.db.execute("SELECT unique_id, data FROM connections"):
+            write_flat_file(os.path.join(directory, f"{unique_id}{FLAT_FILE_SUFFIX}"), json.loads(data))
+            count += 1
+        return count
+
+    def close(self):
+        self.db.close()
@@ -0,0 +1,184 @@
+# connection_tree.py
+import tkinter as tk
+
+FOLDER_PREFIX = "folder:"
+MORE_PREFIX = "more:"
+PLACEHOLDER_PREFIX = "placeholder:"
+PAGE_SIZE = 1000  # Children inserted per "more" page
+BATCH_SIZE = 200  # Children inserted per idle callback
+
+
+def folder_iid(path):
+    return FOLDER_PREFIX + path
+
+
+def group_path(connection_data):
+    """Normalizes the connection's "group" value to "a/b/c" form."""
+    return "/".join(part for part in connection_data.get('group', '').split('/') if part)
+
+
+class LazyConnectionTree:
+    """Populates connections_tree one folder at a time as folders are opened.
+
+    Only the root node exists at startup. Opening a folder inserts its
+    subfolders and connections in small batches from idle callbacks, one page
+    at a time, so the cost of a paint doesn't depend on the number of stored
+    connections. Connection items use the connection's unique_id as their iid.
+    """
+
+    def __init__(self, tree, connections_data, root_text="Connections", on_shown=None):
+        self.tree = tree
+        self.connections_data = connections_data
+        self.on_shown = on_shown  # callable(list of unique_ids) after items are inserted
+        self.root_node = tree.insert("", tk.END, iid=folder_iid(""), text=root_text, values=("",))
+        self.folders = {}  # path -> set of child folder names
+        self.members = {}  # path -> set of unique_ids
+        self.paths = {}  # unique_id -> path
+        self.loaded = {}  # path -> number of connections inserted so far
+        self.paged = {}  # path -> unique_ids inserted or queued for insertion
+        self.tree.bind("<<TreeviewOpen>>", self.on_open, add="+")
+        self.tree.bind("<<TreeviewSelect>>", self.on_select, add="+")
+
+    def rebuild(self):
+        """Re-indexes connections_data and collapses the tree back to the root."""
+        self.folders = {"": set()}
+        self.members = {"": set()}
+        self.paths = {}
+        self.loaded = {}
+        self.paged = {}
+        for unique_id, data in self.connections_data.items():
+            self._index(unique_id, group_path(data))
+        self.tree.delete(*self.tree.get_children(self.root_node))
+        self.tree.item(self.root_node, open=False)
+        self._add_placeholder("")
+
+    def _index(self, unique_id, path):
+        self.paths[unique_id] = path
+        self.members.setdefault(path, set()).add(unique_id)
+        while path:
+            parent, _, name = path.rpartition('/')
+            children = self.folders.setdefault(parent, set())
+            if name in children:
+                break
+            children.add(name)
+            self.folders.setdefault(path, set())
+            path = parent
+
+    def _has_children(self, path):
+        return bool(self.folders.get(path) or self.members.get(path))
+
+    def _add_placeholder(self, path):
+        if self._has_children(path) and not self.tree.exists(PLACEHOLDER_PREFIX + path):
+            self.tree.insert(folder_iid(path), tk.END, iid=PLACEHOLDER_PREFIX + path, text="Loading...", values=("",))
+
+    def on_open(self, event=None):
+        item = self.tree.focus()
+        if item.startswith(FOLDER_PREFIX):
+            path = item[len(FOLDER_PREFIX):]
+            if path not in self.loaded:
+                self.load_folder(path)
+
+    def on_select(self, event=None):
+        for item in self.tree.selection():
+            if item.startswith(MORE_PREFIX):
+                self.tree.delete(item)
+                self._insert_page(item[len(MORE_PREFIX):])
+
+    def load_folder(self, path):
+        self.loaded[path] = 0
+        self.paged[path] = set()
+        if self.tree.exists(PLACEHOLDER_PREFIX + path):
+            self.tree.delete(PLACEHOLDER_PREFIX + path)
+        parent = folder_iid(path)
+        for name in sorted(self.folders.get(path, ())):
+            child = f"{path}/{name}" if path else name
+            self._insert_folder(parent, child, name)
+        self._insert_page(path)
+
+    def _insert_folder(self, parent, path, name, index=tk.END):
+        self.tree.insert(parent, index, iid=folder_iid(path), text=name, values=("",))
+        self._add_placeholder(path)
+
+    def _insert_page(self, path):
+        # Pages are picked by membership rather than position, so connections
+        # added or removed since the last page don't shift what comes next
+        paged = self.paged.setdefault(path, set())
+        members = sorted((uid for uid in self.members.get(path, ()) if uid not in paged),
+                         key=lambda uid: self.connections_data[uid].get('label', ''))
+        page = members[:PAGE_SIZE]
+        paged.update(page)
+        self.loaded[path] = len(paged)
+        self._insert_batch(path, page)
+
+    def _update_more(self, path):
+        """Refreshes the "... N more" item of a paged folder."""
+        if self.tree.exists(MORE_PREFIX + path):
+            remaining = len(self.members.get(path, ())) - self.loaded.get(path, 0)
+            if remaining > 0:
+                self.tree.item(MORE_PREFIX + path, text=f"... {remaining} more")
+            else:
+                self.tree.delete(MORE_PREFIX + path)
+
+    def _insert_batch(self, path, pending):
+        if not self.tree.exists(folder_iid(path)):
+            return
+        batch, pending = pending[:BATCH_SIZE], pending[BATCH_SIZE:]
+        parent = folder_iid(path)
+        shown = []
+        for unique_id in batch:
+            # Skip connections removed or moved to another folder since the page was queued
+            if self.paths.get(unique_id) == path and not self.tree.exists(unique_id):
+                self.tree.insert(parent, tk.END, iid=unique_id, text=self.connections_data[unique_id]['label'], values=(unique_id,))
+                shown.append(unique_id)
+        if shown and self.on_shown:
+            self.on_shown(shown)
+        if pending:
+            self.tree.winfo_toplevel().after_idle(self._insert_batch, path, pending)
+        elif self.loaded.get(path, 0) < len(self.members.get(path, ())):
+            remaining = len(self.members[path]) - self.loaded[path]
+            self.tree.insert(parent, tk.END, iid=MORE_PREFIX + path, text=f"... {remaining} more", values=("",))
+
+    def add(self, unique_id, data):
+        """Indexes a new or changed connection and shows it if its folder is loaded."""
+        self.remove(unique_id)
+        path = group_path(data)
+        self._index(unique_id, path)
+        # Make sure every folder on the way is visible in loaded parents
+        ancestor = ""
+        for name in path.split('/') if path else ():
+            child = f"{ancestor}/{name}" if ancestor else name
+            if ancestor in self.loaded and not self.tree.exists(folder_iid(child)):
+                self._insert_folder(folder_iid(ancestor), child, name)
+            elif ancestor not in self.loaded:
+                self._add_placeholder(ancestor)
+                return
+            ancestor = child
+        if path in self.loaded:
+            self.tree.insert(folder_iid(path), tk.END, iid=unique_id, text=data['label'], values=(unique_id,))
+            self.paged[path].add(unique_id)
+            self.loaded[path] = len(self.paged[path])
+            if self.on_shown:
+                self.on_shown([unique_id])
+        else:
+            self._add_placeholder(path)
+
+    def remove(self, unique_id):
+        old_path = self.paths.pop(unique_id, None)
+        if old_path is not None:
+            self.members[old_path].discard(unique_id)
+            paged = self.paged.get(old_path)
+            if paged is not None and unique_id in paged:
+                # It no longer counts towards the folder's inserted pages
+                paged.discard(unique_id)
+                self.loaded[old_path] = len(paged)
+            self._update_more(old_path)
+        if self.tree.exists(unique_id):
+            self.tree.delete(unique_id)
+
+    def folder_connections(self, path, recursive=True):
+        """Returns the unique_ids stored under a folder, optionally including subfolders."""
+        result = list(self.members.get(path, ()))
+        if recursive:
+            for name in self.folders.get(path, ()):
+                result.extend(self.folder_connections(f"{path}/{name}" if path else name))
+        return result
@@ -2,49 +2,69 @@
 import os
 import tkinter as tk
 from tkinter import simpledialog, messagebox, ttk
+import config
+import connection_store
+import tracing
 
 CONFIG_DIR = os.path.expanduser("~/.config/gemTerm")
 CONNECTION_FILES_DIR = os.path.join(CONFIG_DIR, "connections")
+CONNECTION_DB = os.path.join(CONFIG_DIR, "connections.db")
+
+_store = None
 
 def _ensure_connections_dir_exists():
     if not os.path.exists(CONNECTION_FILES_DIR):
         os.makedirs(CONNECTION_FILES_DIR)
 
-def load_connections():
-    connections_data = {}
+def open_store():
+    """Opens a new handle on the configured connection store.
+
+    The "connection_store" config key selects "sqlite" (default) or "flatfile".
+    Each thread that touches the store needs its own handle.
+    """
     _ensure_connections_dir_exists()
-    for filename in os.listdir(CONNECTION_FILES_DIR):
-        if filename.endswith(".gemTerm"):
-            unique_id = filename[:-len(".gemTerm")]
-            filepath = os.path.join(CONNECTION_FILES_DIR, filename)
-            try:
-                connection_info = {}
-                with open(filepath, 'r') as f:
-                    for line in f:
-                        if '=' in line:
-                            key, value = line.strip().split('=', 1)
-                            connection_info[key] = value
-                if 'label' in connection_info:
-                    connections_data[unique_id] = connection_info
-            except Exception as e:
-                print(f"Error loading connection from {filename}: {e}")
+    backend = config.settings.get_str("connection_store", "sqlite")
+    if backend == "flatfile":
+        return connection_store.FlatFileConnectionStore(CONNECTION_FILES_DIR)
+    return connection_store.SQLiteConnectionStore(CONNECTION_DB)
+
+def get_store():
+    """Returns the Tk thread's connection store, opening it on first use.
+
+    .gemTerm files added or changed since the last start are imported into SQLite.
+    """
+    global _store
+    if _store is None:
+        _store = open_store()
+        migrated = _store.migrate_flat_files(CONNECTION_FILES_DIR)
+        if migrated:
+            print(f"Imported {migrated} connections from {CONNECTION_FILES_DIR} into {CONNECTION_DB}")
+    return _store
+
+def load_connections():
+    with tracing.span("connections.load") as span:
+        connections_data = get_store().load_all()
+        span.attrs['count'] = len(connections_data)
     return connections_data
 
+def get_connection(unique_id):
+    return get_store().get(unique_id)
+
 def save_connection(unique_id, connection_data):
-    _ensure_connections_dir_exists()
-    filepath = os.path.join(CONNECTION_FILES_DIR, f"{unique_id}.gemTerm")
     try:
-        with open(filepath, 'w') as f:
-            for key, value in connection_data.items():
-                f.write(f"{key}={value}\n")
+        get_store().save(unique_id, connection_data)
     except Exception as e:
-        messagebox.showerror("Error", f"Error saving connection '{connection_data.get('label', 'Unnamed')}' to file: {e}")
+        messagebox.showerror("Error", f"Error saving connection '{connection_data.get('label', 'Unnamed')}': {e}")
 
-def add_new_connection(tree, root_node, connections_data):
+def export_flat_files(directory):
+    """Writes every stored connection as a .gemTerm file into directory."""
+    return get_store().export_flat_files(directory)
+
+def add_new_connection(tree, root_node, connections_data, on_added=None):
     dialog = simpledialog.Toplevel(tree)
     dialog.title("Add New Connection")
 
-    labels = ["Label:", "Type:", "Host:", "Auth Type:", "Username:", "Password:", "Private Key File:"]
+    labels = ["Label:", "Type:", "Host:", "Auth Type:", "Username:", "Password:", "Private Key File:", "Group:"]
     entry_vars = [tk.StringVar(dialog) for _ in labels]
     auth_types = ["Password", "Private Key"]
     connection_types = ["SSH", "RDP", "VNC"]
@@ -95,7 +115,7 @@ def add_new_connection(tree, root_node, connections_data):
     else:
         update_auth_fields(None) # Initialize to disabled if no selection
 
-    def save_connection(): # Inner save_connection (command for the button)
+    def on_save(): # Command for the Save button
         label = entry_vars[0].get()
         conn_type = entry_vars[1].get()
         host = entry_vars[2].get()
@@ -103,6 +123,7 @@ def add_new_connection(tree, root_node, connections_data):
         username = entry_vars[4].get()
         password = entry_vars[5].get()
         key_file = entry_vars[6].get()
+        group = entry_vars[7].get().strip('/')
 
         if not label or not conn_type or not host:
             messagebox.showerror("Error", "Label, Type, and Host are required.")
@@ -118,33 +139,42 @@ def add_new_connection(tree, root_node, connections_data):
             'auth.password': password,
             'auth.key_file': key_file
         }
-        connections.save_connection(unique_id, connection_data) # Call the module function
-        tree.insert(root_node, tk.END, text=label, values=(unique_id,))
+        if group:
+            connection_data['group'] = group
+        save_connection(unique_id, connection_data)
+        connections_data[unique_id] = connection_data
+        if on_added:
+            on_added(unique_id, connection_data)
+        else:
+            tree.insert(root_node, tk.END, text=label, values=(unique_id,))
         dialog.destroy()
 
-    save_button = ttk.Button(dialog, text="Save", command=save_connection)
+    save_button = ttk.Button(dialog, text="Save", command=on_save)
     save_button.grid(row=len(labels), column=0, columnspan=2, padx=5, pady=10)
 
     dialog.transient(tree)
     dialog.grab_set()
     tree.wait_window(dialog)
 
-def remove_selected_connection(tree, root_node, connections_data):
+def remove_selected_connection(tree, root_node, connections_data, on_removed=None):
     selected_item = tree.selection()
     if not selected_item:
         messagebox.showinfo("Info", "Please select a connection to remove.")
         return
 
     item_text = tree.item(selected_item[0], 'text')
-    unique_id = tree.item(selected_item[0], 'values')[0]
+    values = tree.item(selected_item[0], 'values')
+    unique_id = values[0] if values else ''
 
     if unique_id:
-        filepath = os.path.join(CONNECTION_FILES_DIR, f"{unique_id}.gemTerm")
         try:
-            os.remove(filepath)
-            del connections_data[unique_id]
-            tree.delete(selected_item[0])
+            get_store().delete(unique_id)
+            connections_data.pop(unique_id, None)
+            if on_removed:
+                on_removed(unique_id)
+            else:
+                tree.delete(selected_item[0])
         except FileNotFoundError:
-            messagebox.showerror("Error", f"Connection file not found: {filepath}")
+            messagebox.showerror("Error", f"Connection file not found for {item_text}")
         except Exception as e:
-            messagebox.showerror("Error", f"Error removing connection: {e}")
\ No newline at end of file
+            messagebox.showerror("Error", f"Error removing connection: {e}")
@@ -0,0 +1,53 @@
+# debug_panel.py
+import tkinter as tk
+from tkinter import ttk, filedialog, messagebox
+import tracing
+
+
+def open_debug_panel(root):
+    """Opens a window with span timings and counters from the tracing ring buffer."""
+    window = tk.Toplevel(root)
+    window.title("gemTerm Debug")
+
+    spans_tree = ttk.Treeview(window, columns=('count', 'mean', 'p95', 'max'), height=12)
+    spans_tree.heading('#0', text='Span')
+    for column, text in (('count', 'Count'), ('mean', 'Mean (ms)'), ('p95', 'p95 (ms)'), ('max', 'Max (ms)')):
+        spans_tree.heading(column, text=text)
+        spans_tree.column(column, width=80, anchor=tk.E)
+    spans_tree.grid(row=0, column=0, columnspan=4, padx=5, pady=5, sticky=(tk.N, tk.S, tk.W, tk.E))
+
+    counters_tree = ttk.Treeview(window, columns=('value',), height=6)
+    counters_tree.heading('#0', text='Counter')
+    counters_tree.heading('value', text='Value')
+    counters_tree.column('value', width=80, anchor=tk.E)
+    counters_tree.grid(row=1, column=0, columnspan=4, padx=5, pady=5, sticky=(tk.W, tk.E))
+
+    window.grid_columnconfigure(0, weight=1)
+    window.grid_rowconfigure(0, weight=1)
+
+    def refresh():
+        spans_tree.delete(*spans_tree.get_children())
+        for name, (count, mean, p95, maximum) in sorted(tracing.summary().items()):
+            spans_tree.insert("", tk.END, text=name, values=(count, f"{mean:.2f}", f"{p95:.2f}", f"{maximum:.2f}"))
+        counters_tree.delete(*counters_tree.get_children())
+        for name, value in sorted(tracing.counters().items()):
+            counters_tree.insert("", tk.END, text=name, values=(value,))
+
+    def export():
+        path = filedialog.asksaveasfilename(parent=window, title="Export trace", defaultextension=".json",
+                                            filetypes=[("Trace JSON", "*.json")])
+        if path:
+            try:
+                count = tracing.export_trace(path)
+                messagebox.showinfo("Export", f"Wrote {count} spans to {path}", parent=window)
+            except Exception as e:
+                messagebox.showerror("Error", f"Error exporting trace: {e}", parent=window)
+
+    def clear():
+        tracing.reset()
+        refresh()
+
+    ttk.Button(window, text="Refresh", command=refresh).grid(row=2, column=0, padx=5, pady=5)
+    ttk.Button(window, text="Export Trace...", command=export).grid(row=2, column=1, padx=5, pady=5)
+    ttk.Button(window, text="Clear", command=clear).grid(row=2, column=2, padx=5, pady=5)
+    refresh()
@@ -0,0 +1,92 @@
+# embed.py
+import time
+import tracing
+
+BACKOFF_MS = (5, 10, 20, 40, 80, 160, 320, 500)  # Delay before each retry; the last one repeats
+EMBED_TIMEOUT = 10.0
+
+
+class EmbedRequest:
+    __slots__ = ('key', 'pid', 'title', 'parent_wid', 'into', 'on_embedded', 'on_failed', 'attempt', 'after_id', 'deadline')
+
+    def __init__(self, key, pid, title, parent_wid, into, on_embedded, on_failed, deadline):
+        self.key = key
+        self.pid = pid
+        self.title = title
+        self.parent_wid = parent_wid
+        self.into = into  # True when xterm was started with -into parent_wid
+        self.on_embedded = on_embedded
+        self.on_failed = on_failed
+        self.attempt = 0
+        self.after_id = None
+        self.deadline = deadline
+
+
+class EmbedTracker:
+    """Embeds new xterm windows as soon as they appear, without blocking Tk.
+
+    X events (window created, mapped or reparented) trigger an immediate
+    lookup for every pending session. A retry timer with exponential backoff
+    covers the xdotool fallback and any event that slips through; a session
+    whose window hasn't appeared by its deadline is reported as failed.
+    """
+
+    def __init__(self, root, x11, timeout=EMBED_TIMEOUT):
+        self.root = root
+        self.x11 = x11
+        self.timeout = timeout
+        self.pending = {}  # key -> EmbedRequest
+        self.event_driven = x11.start_event_watch(root, self.on_window_event)
+
+    def track(self, key, pid, title, parent_wid, into, on_embedded, on_failed=None):
+        request = EmbedRequest(key, pid, title, int(parent_wid), into, on_embedded, on_failed,
+                               time.monotonic() + self.timeout)
+        self.pending[key] = request
+        if into:
+            self.x11.watch_parent(request.parent_wid)
+        if not self._try(request):
+            self._schedule(request)
+
+    def cancel(self, key):
+        request = self.pending.pop(key, None)
+        if request and request.after_id:
+            self.root.after_cancel(request.after_id)
+
+    def _schedule(self, request):
+        delay = BACKOFF_MS[min(request.attempt, len(BACKOFF_MS) - 1)]
+        request.after_id = self.root.after(delay, self._retry, request.key)
+
+    def _retry(self, key):
+        request = self.pending.get(key)
+        if request is None:
+            return
+        request.after_id = None
+        if self._try(request):
+            return
+        if time.monotonic() >= request.deadline:
+            self.pending.pop(key, None)
+            tracing.count("embed.failed")
+            if request.on_failed:
+                request.on_failed(key)
+            return
+        request.attempt += 1
+        tracing.count("embed.retry")
+        self._schedule(request)
+
+    def _try(self, request):
+        wid = self.x11.find_client(request.pid, request.title, request.parent_wid if request.into else None)
+        if not wid:
+            return False
+        self.x11.remember(request.key, wid)
+        if not request.into and not self.x11.reparent(request.key, request.parent_wid):
+            return False
+        self.pending.pop(request.key, None)
+        if request.after_id:
+            self.root.after_cancel(request.after_id)
+            request.after_id = None
+        request.on_embedded(request.key)
+        return True
+
+    def on_window_event(self):
+        for request in list(self.pending.values()):
+            self._try(request)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# gemterm_askpass.py
+"""SSH_ASKPASS helper: fetches a session's password from gemTerm's askpass broker.
+
+ssh runs this with the prompt as its argument; the answer is printed to
+stdout. The socket and one-shot token come from the environment gemTerm
+set up for the session. The broker only answers password prompts; other
+prompts (host key confirmation, key passphrases) are asked on the
+session's terminal, as ssh itself would without SSH_ASKPASS.
+"""
+import os
+import socket
+import sys
+import termios
+
+REPLY_SECRET = b"secret\n"
+REPLY_ASK = b"ask\n"
+
+
+def ask_tty(prompt, echo):
+    """Asks prompt on the controlling terminal; returns None if there is none."""
+    try:
+        fd = os.open("/dev/tty", os.O_RDWR | os.O_NOCTTY)
+    except OSError:
+        return None
+    with os.fdopen(fd, "r") as tty:
+        os.write(fd, prompt.encode())
+        saved = None
+        if not echo:
+            saved = termios.tcgetattr(fd)
+            quiet = list(saved)
+            quiet[3] &= ~termios.ECHO
+            termios.tcsetattr(fd, termios.TCSAFLUSH, quiet)
+        try:
+            answer = tty.readline()
+        finally:
+            if saved is not None:
+                termios.tcsetattr(fd, termios.TCSAFLUSH, saved)
+                os.write(fd, b"\n")
+    return answer.rstrip("\n")
+
+
+def main():
+    address = os.environ.get('GEMTERM_ASKPASS_SOCKET')
+    token = os.environ.get('GEMTERM_ASKPASS_TOKEN')
+    if not address or not token:
+        return 1
+    prompt = sys.argv[1] if len(sys.argv) > 1 else ""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(5.0)
+        try:
+            sock.connect("\0" + address)
+            sock.sendall(f"{token}\n{prompt}\n".encode())
+            sock.shutdown(socket.SHUT_WR)
+            reply = b""
+            while True:
+                chunk = sock.recv(4096)
+                if not chunk:
+                    break
+                reply += chunk
+        except OSError:
+            return 1
+    if reply.startswith(REPLY_SECRET):
+        sys.stdout.write(reply[len(REPLY_SECRET):].decode() + "\n")
+        return 0
+    if reply != REPLY_ASK:
+        # Token unknown or its password already used: fail instead of answering a retry prompt
+        return 1
+    kind = os.environ.get('SSH_ASKPASS_PROMPT', '')
+    if kind == "none":
+        # A notice such as "Confirm user presence for key ...": show it, nothing to answer
+        try:
+            fd = os.open("/dev/tty", os.O_WRONLY | os.O_NOCTTY)
+            os.write(fd, (prompt + "\n").encode())
+            os.close(fd)
+        except OSError:
+            pass
+        return 0
+    # Questions (host keys, confirmations) are answered visibly, anything else is a secret
+    answer = ask_tty(prompt, echo=kind == "confirm" or prompt.rstrip().endswith("?"))
+    if answer is None:
+        return 1
+    if kind == "confirm":
+        return 0 if answer.strip().lower() in ("y", "yes") else 1
+    sys.stdout.write(answer + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+# icons.py
+import os
+import tempfile
+import tkinter as tk
+import config
+import tracing
+
+IMAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "images")
+CACHE_DIR = os.path.join(config.CONFIG_DIR, "icon_cache")
+
+
+def _render(source, cached, size):
+    """Writes source resized to size x size as a PNG Tk can read directly."""
+    from PIL import Image  # Only needed when the cache is missing or stale
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with Image.open(source) as image:
+        resized = image.resize((size, size))
+    fd, tmp_path = tempfile.mkstemp(prefix=".icon-", suffix=".png", dir=CACHE_DIR)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            resized.save(f, format="PNG")
+        os.replace(tmp_path, cached)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def load(master, name, size):
+    """Returns a size x size PhotoImage of images/<name>.png, or None if it can't be loaded.
+
+    The resized icon is cached as a PNG in the config dir, so normal starts
+    only ask Tk to read a small file. Without PIL the original image is
+    subsampled by Tk instead.
+    """
+    source = os.path.join(IMAGES_DIR, f"{name}.png")
+    cached = os.path.join(CACHE_DIR, f"{name}-{size}.png")
+    with tracing.span("startup.icon", name=name) as span:
+        try:
+            source_mtime = os.stat(source).st_mtime_ns
+        except FileNotFoundError:
+            print(f"Warning: '{source}' not found.")
+            return None
+        try:
+            fresh = os.stat(cached).st_mtime_ns >= source_mtime
+        except FileNotFoundError:
+            fresh = False
+        try:
+            if not fresh:
+                span.attrs['rendered'] = True
+                _render(source, cached, size)
+            return tk.PhotoImage(master=master, file=cached)
+        except ImportError:
+            image = tk.PhotoImage(master=master, file=source)
+            factor = max(1, image.width() // size)
+            return image.subsample(factor) if factor > 1 else image
+        except Exception as e:
+            print(f"Warning: Error loading icon {name}: {e}")
+            return None
@@ -0,0 +1,266 @@
+# importer.py
+import csv
+import json
+import os
+import queue
+import re
+import threading
+import tkinter as tk
+from tkinter import ttk, filedialog, messagebox
+import connections
+import tracing
+
+BATCH_SIZE = 500  # Connections written per store transaction
+UI_CHUNK = 300  # Connections handed to the UI per Tk callback
+READ_SIZE = 1 << 16
+KEYWORD_SEPARATOR = re.compile(r'\s*=\s*|\s+')
+
+# CSV/JSON field names accepted for each connection key
+FIELD_ALIASES = {
+    'label': ('label', 'name', 'alias'),
+    'host': ('host', 'hostname', 'address', 'ip'),
+    'type': ('type', 'protocol'),
+    'auth.username': ('auth.username', 'username', 'user'),
+    'auth.password': ('auth.password', 'password'),
+    'auth.key_file': ('auth.key_file', 'key_file', 'identityfile', 'identity_file', 'key'),
+    'group': ('group', 'folder'),
+}
+
+
+def iter_ssh_config(path):
+    """Yields one record per concrete Host alias in an OpenSSH client config."""
+    aliases = []
+    options = {}
+
+    def flush():
+        for alias in aliases:
+            yield {'label': alias, 'host': options.get('hostname', alias), 'type': "SSH",
+                   'auth.username': options.get('user', ''), 'auth.key_file': options.get('identityfile', '')}
+
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            # ssh_config(5): the keyword is followed by whitespace and/or a single '='
+            key, value = (KEYWORD_SEPARATOR.split(line, maxsplit=1) + [""])[:2]
+            key, value = key.lower(), value.strip().strip('"')
+            if key in ('host', 'match'):
+                yield from flush()
+                # Wildcard and negated patterns describe defaults, not hosts
+                aliases = [a for a in value.split() if key == 'host' and not any(c in a for c in '*?!')]
+                options = {}
+            elif key not in options:
+                # First value wins, as in ssh itself
+                options[key] = os.path.expanduser(value) if key == 'identityfile' else value
+    yield from flush()
+
+
+def iter_csv(path):
+    with open(path, 'r', newline='') as f:
+        for row in csv.DictReader(f):
+            yield {key.strip().lower(): value for key, value in row.items() if key}
+
+
+def iter_json(path):
+    """Yields objects from a JSON array or a JSON Lines file without loading it whole."""
+    decoder = json.JSONDecoder()
+    with open(path, 'r') as f:
+        buffer = f.read(READ_SIZE).lstrip()
+        in_array = buffer.startswith('[')
+        if in_array:
+            buffer = buffer[1:]
+        eof = False
+        while True:
+            buffer = buffer.lstrip().lstrip(',').lstrip()
+            if in_array and buffer.startswith(']'):
+                return
+            try:
+                obj, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                if eof:
+                    if buffer.strip():
+                        raise
+                    return
+                chunk = f.read(READ_SIZE)
+                eof = not chunk
+                buffer += chunk
+                continue
+            if isinstance(obj, dict):
+                yield {key.lower(): value for key, value in obj.items()}
+            buffer = buffer[end:]
+
+
+def iter_records(path):
+    if path.lower().endswith('.csv'):
+        return iter_csv(path)
+    if path.lower().endswith(('.json', '.jsonl')):
+        return iter_json(path)
+    return iter_ssh_config(path)
+
+
+def normalize(record, default_group):
+    connection_data = {}
+    for key, aliases in FIELD_ALIASES.items():
+        for alias in aliases:
+            value = record.get(alias)
+            if value not in (None, ''):
+                connection_data[key] = str(value)
+                break
+    if not connection_data.get('host'):
+        return None
+    connection_data.setdefault('label', connection_data['host'])
+    connection_data['type'] = connection_data.get('type', 'SSH').upper()
+    if connection_data.get('auth.password'):
+        connection_data['auth.type'] = "Password"
+    elif connection_data.get('auth.key_file'):
+        connection_data['auth.type'] = "Private Key"
+    connection_data.setdefault('group', default_group)
+    return connection_data
+
+
+def dedupe_key(connection_data):
+    return (connection_data.get('host', '').lower(), connection_data.get('auth.username', ''))
+
+
+class BulkImport:
+    """Imports a file on a worker thread and feeds the UI in small chunks.
+
+    The worker parses records as a stream, skips ones whose host+user already
+    exist, and writes new connections to the store in batches. Tk picks the
+    written connections up from a queue UI_CHUNK at a time via after(), so
+    the window stays responsive during large imports.
+    """
+
+    def __init__(self, root, path, existing, on_imported, on_progress, on_done):
+        self.root = root
+        self.path = path
+        self.seen = {dedupe_key(data) for data in existing.values()}
+        self.on_imported = on_imported  # callable(list of (unique_id, connection_data))
+        self.on_progress = on_progress  # callable(read, imported, skipped)
+        self.on_done = on_done  # callable(error or None)
+        self.queue = queue.Queue()
+        self.backlog = []  # Written connections not yet handed to the UI
+        self.finished = False
+        self.error = None
+        self.cancelled = threading.Event()
+        self.read = self.imported = self.skipped = 0
+        self.default_group = "Imported/" + ("ssh_config" if os.path.basename(path) == "config" else os.path.basename(path))
+        self.worker = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.worker.start()
+        self.root.after(50, self._drain)
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def _new_connections(self):
+        for record in iter_records(self.path):
+            if self.cancelled.is_set():
+                return
+            self.read += 1
+            connection_data = normalize(record, self.default_group)
+            if connection_data is None or dedupe_key(connection_data) in self.seen:
+                self.skipped += 1
+                continue
+            self.seen.add(dedupe_key(connection_data))
+            yield os.urandom(8).hex(), connection_data
+
+    def _run(self):
+        # SQLite connections can't cross threads, so the worker opens its own store
+        store = connections.open_store()
+        error = None
+        try:
+            with tracing.span("connections.import", path=self.path):
+                batch = []
+                for item in self._new_connections():
+                    batch.append(item)
+                    if len(batch) >= BATCH_SIZE:
+                        self._write(store, batch)
+                        batch = []
+                if batch:
+                    self._write(store, batch)
+        except Exception as e:
+            error = e
+        finally:
+            store.close()
+        self.queue.put(('done', error))
+
+    def _write(self, store, batch):
+        store.save_many(batch, BATCH_SIZE)
+        self.imported += len(batch)
+        self.queue.put(('batch', batch))
+
+    def _drain(self):
+        while len(self.backlog) < UI_CHUNK and not self.finished:
+            try:
+                kind, payload = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'done':
+                self.finished, self.error = True, payload
+            else:
+                self.backlog.extend(payload)
+        chunk, self.backlog = self.backlog[:UI_CHUNK], self.backlog[UI_CHUNK:]
+        if chunk:
+            self.on_imported(chunk)
+        self.on_progress(self.read, self.imported, self.skipped)
+        if self.finished and not self.backlog:
+            self.on_done(self.error)
+        else:
+            self.root.after(1 if self.backlog or chunk else 50, self._drain)
+
+
+def open_import_dialog(root, connections_data, on_imported):
+    """Opens the bulk import window for ~/.ssh/config, CSV and JSON inventories."""
+    window = tk.Toplevel(root)
+    window.title("Import Connections")
+
+    status_var = tk.StringVar(window, value="Choose a source to import.")
+    progress = ttk.Progressbar(window, mode='indeterminate', length=300)
+    state = {'job': None}
+
+    def start(path):
+        if not path or state['job'] is not None:
+            return
+        if not os.path.exists(path):
+            messagebox.showerror("Error", f"File not found: {path}", parent=window)
+            return
+        progress.start(10)
+        ssh_button.config(state=tk.DISABLED)
+        file_button.config(state=tk.DISABLED)
+        state['job'] = BulkImport(root, path, connections_data, on_imported, on_progress, on_done)
+        state['job'].start()
+
+    def on_progress(read, imported, skipped):
+        if window.winfo_exists():
+            status_var.set(f"Read {read}, imported {imported}, skipped {skipped} duplicates or invalid")
+
+    def on_done(error):
+        state['job'] = None
+        if not window.winfo_exists():
+            return
+        progress.stop()
+        close_button.config(text="Close")
+        if error:
+            messagebox.showerror("Error", f"Import stopped: {error}", parent=window)
+
+    def choose_file():
+        start(filedialog.askopenfilename(parent=window, title="Import inventory",
+                                         filetypes=[("Inventories", "*.csv *.json *.jsonl"), ("SSH config", "*"), ("All files", "*")]))
+
+    def close():
+        if state['job'] is not None:
+            state['job'].cancel()
+        window.destroy()
+
+    ssh_button = ttk.Button(window, text="Import ~/.ssh/config", command=lambda: start(os.path.expanduser("~/.ssh/config")))
+    ssh_button.grid(row=0, column=0, padx=5, pady=5)
+    file_button = ttk.Button(window, text="Import File...", command=choose_file)
+    file_button.grid(row=0, column=1, padx=5, pady=5)
+    progress.grid(row=1, column=0, columnspan=2, padx=5, pady=5, sticky=(tk.W, tk.E))
+    ttk.Label(window, textvariable=status_var).grid(row=2, column=0, columnspan=2, padx=5, pady=5, sticky=tk.W)
+    close_button = ttk.Button(window, text="Cancel", command=close)
+    close_button.grid(row=3, column=0, columnspan=2, padx=5, pady=5)
+    window.protocol("WM_DELETE_WINDOW", close)
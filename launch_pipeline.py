@@ -0,0 +1,116 @@
+# launch_pipeline.py
+import os
+import queue
+import subprocess
+import tkinter as tk
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import tracing
+
+
+class SpawnJob:
+    __slots__ = ('key', 'argv', 'env', 'popen_kwargs', 'on_spawned', 'on_failed', 'queued_ns')
+
+    def __init__(self, key, argv, env, on_spawned, on_failed, popen_kwargs):
+        self.key = key
+        self.argv = argv
+        self.env = env
+        self.popen_kwargs = popen_kwargs  # e.g. the pty fds of a native terminal
+        self.on_spawned = on_spawned  # callable(process), called on the Tk thread
+        self.on_failed = on_failed  # callable(error), called on the Tk thread
+        self.queued_ns = tracing.now_ns()
+
+
+class LaunchPipeline:
+    """Spawns session processes on worker threads with a cap on sessions in flight.
+
+    A session is in flight from the moment its process is spawned until the
+    caller settles it (its window was embedded, never appeared, or the
+    process died). Jobs over the cap wait in a FIFO queue, so opening many
+    connections at once keeps the X server busy without flooding it.
+    Spawn results come back to Tk through a self-pipe file handler.
+    """
+
+    def __init__(self, root, max_in_flight=8):
+        self.root = root
+        self.max_in_flight = max(1, max_in_flight)
+        self.waiting = deque()  # SpawnJob not yet started
+        self.in_flight = set()  # keys spawned or spawning and not yet settled
+        self.results = queue.Queue()  # (job, process or None, error or None)
+        self.executor = ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="spawn")
+        self.wakeup_r, self.wakeup_w = os.pipe()
+        os.set_blocking(self.wakeup_r, False)
+        os.set_blocking(self.wakeup_w, False)
+        self.root.tk.createfilehandler(self.wakeup_r, tk.READABLE, self._on_wakeup)
+
+    def spawn(self, key, argv, env, on_spawned, on_failed, **popen_kwargs):
+        self.waiting.append(SpawnJob(key, argv, env, on_spawned, on_failed, popen_kwargs))
+        self._pump()
+
+    def cancel(self, key):
+        """Drops a queued job; a job already spawning still reports its result."""
+        self.waiting = deque(job for job in self.waiting if job.key != key)
+        self.settle(key)
+
+    def settle(self, key):
+        if key in self.in_flight:
+            self.in_flight.discard(key)
+            self._pump()
+
+    def pending(self):
+        return len(self.waiting) + len(self.in_flight)
+
+    def _pump(self):
+        while self.waiting and len(self.in_flight) < self.max_in_flight:
+            job = self.waiting.popleft()
+            tracing.record("launch.queued", job.queued_ns, tracing.now_ns(), key=job.key)
+            self.in_flight.add(job.key)
+            self.executor.submit(self._run, job)
+
+    def _run(self, job):
+        process = error = None
+        try:
+            with tracing.span("process.spawn", key=job.key):
+                tracing.count("subprocess.spawn")
+                process = subprocess.Popen(job.argv, env=job.env, **job.popen_kwargs)
+        except OSError as e:
+            error = e
+        self.results.put((job, process, error))
+        try:
+            os.write(self.wakeup_w, b"\0")
+        except BlockingIOError:
+            pass
+
+    def _on_wakeup(self, fd, mask):
+        try:
+            while os.read(self.wakeup_r, 512):
+                pass
+        except BlockingIOError:
+            pass
+        while True:
+            try:
+                job, process, error = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if error is not None:
+                self.settle(job.key)
+                job.on_failed(error)
+            else:
+                job.on_spawned(process)
+
+    def close(self):
+        """Drops queued jobs and returns the processes spawned but not yet handed over."""
+        self.waiting.clear()
+        self.executor.shutdown(wait=True)
+        orphans = []
+        while True:
+            try:
+                _, process, _ = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if process is not None:
+                orphans.append(process)
+        self.root.tk.deletefilehandler(self.wakeup_r)
+        os.close(self.wakeup_r)
+        os.close(self.wakeup_w)
+        return orphans
@@ -1,22 +1,48 @@
 # main.py
+import time
+IMPORT_STARTED_NS = time.perf_counter_ns()  # Start of the import phase reported by --profile-startup
 import tkinter as tk
 from tkinter import ttk
 from tkinter import font as tkFont
-from tkinter import simpledialog
 from tkinter import messagebox
-import subprocess
+from tkinter import filedialog
 import platform
-import time
-from PIL import Image, ImageTk
 import os
 import connections  # Import the connections module
 import config  # Import the config module
-import tempfile
+import x11  # In-process X11 window management
+import resize  # Coalesced resize scheduling
+import reaper  # Event-driven child process reaping
+import terminate  # Parallel session termination
+import connection_tree  # Lazily populated connection folders
+import search  # Trigram index for quick connect
+import quick_connect  # Ctrl+K quick connect bar
+import ssh_pool  # Shared SSH ControlMaster connections
+import xterm_pool  # Pre-warmed xterms
+import embed  # Event-driven window embedding
+import tracing  # Spans and counters for the debug panel
+import debug_panel
+# importer, prober, term_view and watcher are imported where first used, after first paint
+import launch_pipeline  # Concurrent session spawning
+import sessions  # Registry of open sessions
+import workspace  # Saved tab set for session restore
+import askpass  # In-memory password handoff to ssh
+import icons  # Cached toolbar icons
+import shlex
+import argparse
+
+tracing.record("startup.imports", IMPORT_STARTED_NS, tracing.now_ns())
+
+PASSWORD_AUTH_TYPES = ("Password", "Username/Password")
+BATCH_CONFIRM_THRESHOLD = 25  # Ask before opening more sessions than this at once
 
 class TabbedInterface(tk.Tk):
-    def __init__(self):
+    def __init__(self, profile_startup=False):
+        started_ns = tracing.now_ns()
         super().__init__()
         self.title("gemTerm")
+        self.profile_startup = profile_startup
+        self.startup_complete = False
 
         # Load initial window size from config
         initial_size = config.get_window_size()
@@ -33,35 +59,32 @@ class TabbedInterface(tk.Tk):
         self.button_frame = ttk.Frame(self.left_frame)
         self.button_frame.pack(pady=5, padx=5, fill=tk.X)
 
-        # Initialize connections dictionary from config
-        self.connections_data = connections.load_connections()
+        # Connections are loaded by finish_startup once the window shell is on screen;
+        # the dict is shared with the tree, quick connect and the dialogs, so it is filled in place
+        self.connections_data = {}
 
         # Button to add new connection (+)
         self.add_host_button = ttk.Button(self.button_frame, text="+", width=2,
-            command=lambda: connections.add_new_connection(self.connections_tree, self.connections_root, self.connections_data))
+            command=lambda: connections.add_new_connection(self.connections_tree, self.connections_root, self.connections_data, self.on_connection_added))
         self.add_host_button.pack(side=tk.LEFT)
 
         # Button to remove selected connection (-)
         self.remove_host_button = ttk.Button(self.button_frame, text="-", width=2,
-            command=lambda: connections.remove_selected_connection(self.connections_tree, self.connections_root, self.connections_data))
+            command=lambda: connections.remove_selected_connection(self.connections_tree, self.connections_root, self.connections_data, self.on_connection_removed))
         self.remove_host_button.pack(side=tk.LEFT, padx=2)
 
+        # Button to bulk import connections
+        self.import_button = ttk.Button(self.button_frame, text="Import", width=6,
+            command=self.open_import)
+        self.import_button.pack(side=tk.LEFT, padx=2)
+
         # Settings Button with Gear Icon
-        try:
-            image_path = os.path.join("images", "gear_icon.png")
-            gear_image = Image.open(image_path)
-            gear_photo = ImageTk.PhotoImage(gear_image.resize((16, 16)))
-            self.settings_icon = gear_photo
+        self.settings_icon = icons.load(self, "gear_icon", 16)
+        if self.settings_icon is not None:
             self.settings_button = ttk.Button(self.button_frame, image=self.settings_icon, command=self.open_settings)
-            self.settings_button.pack(side=tk.LEFT, padx=2)
-        except FileNotFoundError:
-            print("Warning: 'images/gear_icon.png' not found. Settings button will have text.")
-            self.settings_button = ttk.Button(self.button_frame, text="⚙", width=2, command=self.open_settings)
-            self.settings_button.pack(side=tk.LEFT, padx=2)
-        except Exception as e:
-            print(f"Warning: Error loading gear icon: {e}")
+        else:
             self.settings_button = ttk.Button(self.button_frame, text="⚙", width=2, command=self.open_settings)
-            self.settings_button.pack(side=tk.LEFT, padx=2)
+        self.settings_button.pack(side=tk.LEFT, padx=2)
 
         # Treeview for connections
         self.connections_tree = ttk.Treeview(self.left_frame, columns=('unique_id',))
@@ -70,14 +93,27 @@ class TabbedInterface(tk.Tk):
         self.connections_tree.column('unique_id', width=0, stretch=tk.NO) # Hide the unique ID column
         self.connections_tree.pack(fill=tk.BOTH, expand=True)
 
-        # Add the top-level "Connections" item
-        self.connections_root = self.connections_tree.insert("", tk.END, text="Connections")
-
-        # Populate the treeview with loaded connections
-        for unique_id, data in self.connections_data.items():
-            self.connections_tree.insert(self.connections_root, tk.END, text=data['label'], values=(unique_id,))
+        # Add the top-level "Connections" item; folders are populated when opened
+        self.connection_tree = connection_tree.LazyConnectionTree(self.connections_tree, self.connections_data,
+                                                                  on_shown=self.probe_connections)
+        self.connections_root = self.connection_tree.root_node
+        self.connection_tree.rebuild()
 
         self.connections_tree.bind("<Double-1>", self.on_treeview_doubleclick)
+        self.connections_tree.bind("<Return>", self.on_treeview_doubleclick)
+        self.tree_menu = tk.Menu(self, tearoff=0)
+        self.connections_tree.bind("<Button-3>", self.on_treeview_menu)
+
+        # Reachability status icons for visible and selected connections; started by finish_startup
+        self.prober = None
+        self.status_icons = {}
+        self.probe_poll_id = None
+
+        # Quick connect bar (Ctrl+K), backed by a search index built by finish_startup
+        self.search_index = search.TrigramIndex()
+        self.quick_connect = quick_connect.QuickConnectBar(self.left_frame, self.search_index, self.connections_data, self.launch_connection)
+        self.bind_all("<Control-k>", self.open_quick_connect)
+        self.connection_watcher = None  # Started by finish_startup
 
         # Right Frame (Notebook/Tabbed Interface)
         self.right_frame = ttk.Frame(self)
@@ -88,37 +124,309 @@ class TabbedInterface(tk.Tk):
         self.notebook = ttk.Notebook(self.right_frame)
         self.notebook.pack(fill=tk.BOTH, expand=True)
 
-        self.xterm_processes = {}  # Dictionary to store xterm processes (tab_name: pid)
-        self.tab_content_frames = {} # Dictionary to store the content frames of each tab
+        # Status line for session exits
+        self.status_var = tk.StringVar(self)
+        self.status_label = ttk.Label(self.left_frame, textvariable=self.status_var, anchor=tk.W)
+        self.status_label.pack(side=tk.BOTTOM, fill=tk.X, padx=5, before=self.connections_tree)
+        self.status_var.set("Loading connections...")
+
+        self.sessions = sessions.SessionRegistry()  # Open tabs, indexed by session id, frame, pid and window
+        self.reaper = reaper.ChildReaper(self, self._on_process_exit)
+        self.x11 = x11.X11Backend()  # Persistent display connection and window id cache
+        self.embedder = embed.EmbedTracker(self, self.x11)
+        self.embed_into = config.settings.get_bool("xterm_embed_into", True)  # Start xterm with -into the tab frame
+        self.resize_scheduler = resize.ResizeScheduler(self.notebook, self.resize_xterm)
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed, add="+")
+        self.launcher = launch_pipeline.LaunchPipeline(self, max_in_flight=config.settings.get_int("max_inflight_spawns", 8))
+        self.spawn_error_shown = False
+        self.askpass = askpass.AskpassBroker() if askpass.helper_usable() else None
+        self.ssh_pool = None
+        if config.settings.get_bool("ssh_multiplexing", True):
+            self.ssh_pool = ssh_pool.SSHMasterPool(os.path.join(config.CONFIG_DIR, "ssh_masters"),
+                                                   max_masters=config.settings.get_int("ssh_max_masters", 16),
+                                                   idle_seconds=config.settings.get_int("ssh_master_idle_seconds", 600))
+            self.after(60000, self._sweep_ssh_pool)
+
+        # Optional pool of idle xterms parked in a hidden frame
+        self.xterm_pool = None
+        pool_size = config.settings.get_int("xterm_pool_size", 0)
+        if pool_size > 0 and platform.system() == "Linux":
+            self.xterm_pool_holder = ttk.Frame(self)
+            self.xterm_pool = xterm_pool.WarmXtermPool(self, self.x11, self.embedder, self.xterm_pool_holder, pool_size,
+                                                       self.xterm_args, into=self.embed_into)
+            self.after(1000, lambda: self.xterm_pool.fill((self.default_font['family'], self.default_font['size'])))
 
         # Bind the closing protocol to our on_closing method
         self.protocol("WM_DELETE_WINDOW", self.on_closing)
 
         # Load the default font
-        self.default_font = tkFont.Font(family=config.get_default_font()[0], size=config.get_default_font()[1])
+        font_family, font_size = config.get_default_font()
+        self.default_font = tkFont.Font(family=font_family, size=font_size)
+
+        # Checkpoint the open tab set; finish_startup offers to restore the last one
+        self.restore_bar = None
+        self.checkpoint_ms = max(1000, int(config.settings.get_float("workspace_checkpoint_seconds", 30) * 1000))
+        self.after(self.checkpoint_ms, self._checkpoint_workspace)
+
+        # The idle pass maps and draws the shell, and Tk flushes it to the X
+        # server before the next timer fires, so loading starts after first paint
+        self.shell_ready_ns = tracing.now_ns()
+        tracing.record("startup.shell", started_ns, self.shell_ready_ns)
+        self.after_idle(lambda: self.after(0, self.finish_startup))
+
+    def finish_startup(self):
+        """Second startup stage: loads connections and starts the services that need them."""
+        tracing.record("startup.first_paint", self.shell_ready_ns, tracing.now_ns())
+        if config.settings.get_bool("probe_enabled", True):
+            with tracing.span("startup.prober"):
+                self.start_prober()  # Before the rebuild, so the first visible rows are probed
+        with tracing.span("startup.connections") as span:
+            self.connections_data.update(connections.load_connections())
+            self.connection_tree.rebuild()
+            span.attrs['count'] = len(self.connections_data)
+        with tracing.span("startup.search_index"):
+            self.search_index.build(self.connections_data)
+        self.status_var.set(f"{len(self.connections_data)} connections")
+
+        # Pick up .gemTerm files added, edited or deleted while running
+        if config.settings.get_bool("watch_connection_files", True):
+            with tracing.span("startup.watcher"):
+                import watcher
+                self.connection_watcher = watcher.ConnectionDirWatcher(
+                    self, connections.CONNECTION_FILES_DIR, connections.get_store(), self.on_connection_files_changed,
+                    poll_interval_ms=int(config.settings.get_float("watch_poll_seconds", 5.0) * 1000))
+                self.connection_watcher.start()
+
+        self.offer_restore()
+        self.startup_complete = True
+        tracing.record("startup.total", IMPORT_STARTED_NS, tracing.now_ns())
+        if self.profile_startup:
+            print_startup_profile()
+
+    def start_prober(self):
+        import prober
+        self.prober = prober.ReachabilityProber(concurrency=config.settings.get_int("probe_concurrency", 256),
+                                                timeout=config.settings.get_float("probe_timeout", 2.0),
+                                                ttl=config.settings.get_float("probe_ttl", 120.0))
+        for state, color in (('up', '#2e9d3a'), ('down', '#c8362f'), ('unknown', '#a0a0a0')):
+            icon = tk.PhotoImage(self, width=10, height=10)
+            icon.put(color, to=(1, 1, 9, 9))
+            self.status_icons[state] = icon
+        self.connections_tree.bind("<<TreeviewSelect>>", lambda event: self.probe_connections(self.connections_tree.selection()), add="+")
+
+    def after(self, ms, func=None, *args):
+        tracing.count("tk.after")
+        return super().after(ms, func, *args)
+
+    def after_idle(self, func, *args):
+        tracing.count("tk.after")
+        return super().after_idle(func, *args)
 
     def open_settings(self):
         config.open_settings(self)
 
+    def open_import(self):
+        import importer
+        importer.open_import_dialog(self, self.connections_data, self.on_connections_imported)
+
+    def open_debug_panel(self):
+        debug_panel.open_debug_panel(self)
+
+    def on_connection_added(self, unique_id, connection_data):
+        self.connection_tree.add(unique_id, connection_data)
+        self.search_index.add(unique_id, connection_data)
+
+    def on_connection_removed(self, unique_id):
+        self.connection_tree.remove(unique_id)
+        self.search_index.remove(unique_id)
+
+    def probe_connections(self, unique_ids):
+        if not self.prober:
+            return
+        import prober
+        items = []
+        for unique_id in unique_ids:
+            data = self.connections_data.get(unique_id)
+            address = prober.probe_address(data) if data else None
+            if address:
+                items.append((unique_id, address))
+        hits = self.prober.probe(items)
+        for unique_id, address in items:
+            if unique_id in hits:
+                self.set_status_icon(unique_id, hits[unique_id])
+            elif self.connections_tree.exists(unique_id) and not self.connections_tree.item(unique_id, 'image'):
+                self.connections_tree.item(unique_id, image=self.status_icons['unknown'])
+        if self.prober.pending() and self.probe_poll_id is None:
+            self.probe_poll_id = self.after(100, self._poll_probes)
+
+    def _poll_probes(self):
+        self.probe_poll_id = None
+        for unique_id, up in self.prober.results():
+            self.set_status_icon(unique_id, up)
+        if self.prober.pending():
+            self.probe_poll_id = self.after(100, self._poll_probes)
+
+    def set_status_icon(self, unique_id, up):
+        if self.connections_tree.exists(unique_id):
+            self.connections_tree.item(unique_id, image=self.status_icons['up' if up else 'down'])
+
+    def on_connections_imported(self, items):
+        for unique_id, connection_data in items:
+            self.connections_data[unique_id] = connection_data
+            self.on_connection_added(unique_id, connection_data)
+        self.status_var.set(f"{len(self.connections_data)} connections")
+
+    def on_connection_files_changed(self, upserts, removed):
+        """Applies the watcher's parsed files to connections_data, the tree and the search index."""
+        changed = 0
+        for unique_id, connection_data in upserts:
+            current = self.connections_data.get(unique_id)
+            if current == connection_data:
+                continue  # Typically a file gemTerm just saved itself
+            changed += 1
+            if current is None:
+                self.connections_data[unique_id] = connection_data
+                self.on_connection_added(unique_id, connection_data)
+                continue
+            moved = connection_tree.group_path(current) != connection_tree.group_path(connection_data)
+            # Update the shared record in place so open sessions see the new details
+            current.clear()
+            current.update(connection_data)
+            if moved:
+                self.on_connection_added(unique_id, current)
+            else:
+                if self.connections_tree.exists(unique_id):
+                    self.connections_tree.item(unique_id, text=current['label'])
+                self.search_index.add(unique_id, current)
+        for unique_id in removed:
+            if self.connections_data.pop(unique_id, None) is not None:
+                changed += 1
+                self.on_connection_removed(unique_id)
+        if changed:
+            self.status_var.set(f"{len(self.connections_data)} connections ({changed} updated from disk)")
+
+    def open_quick_connect(self, event=None):
+        self.quick_connect.show(before=self.connections_tree)
+        return "break"
+
+    def launch_latency_summary(self):
+        if self.xterm_pool:
+            return self.xterm_pool.latency_summary()
+        return "warm xterm pool disabled (xterm_pool_size)"
+
+    def open_ssh_masters(self):
+        if self.ssh_pool:
+            ssh_pool.open_ssh_masters(self, self.ssh_pool, lambda target: [
+                session.tab_name for session in self.sessions if session.ssh_target == target])
+        else:
+            messagebox.showinfo("Info", "SSH multiplexing is disabled (ssh_multiplexing in the config file).")
+
+    def _sweep_ssh_pool(self):
+        self.ssh_pool.sweep()
+        self.after(60000, self._sweep_ssh_pool)
+
+    def ssh_command(self, target, session):
+        """Builds the ssh argument list for target, riding a pooled master when enabled."""
+        options = ["-o", "StrictHostKeyChecking=no"]
+        if self.ssh_pool and target:
+            options += self.ssh_pool.acquire(target)
+            session.ssh_target = target
+        return ["ssh"] + options + ([target] if target else [])
+
+    def release_ssh_target(self, session):
+        if self.ssh_pool and session.ssh_target:
+            self.ssh_pool.release(session.ssh_target)
+            session.ssh_target = None
+
+    def export_connections(self):
+        directory = filedialog.askdirectory(parent=self, title="Export connections as .gemTerm files")
+        if directory:
+            try:
+                count = connections.export_flat_files(directory)
+                self.status_var.set(f"Exported {count} connections")
+            except Exception as e:
+                messagebox.showerror("Error", f"Error exporting connections: {e}")
+
     def on_closing(self):
         """Saves the current window size before closing."""
         self.update()  # Ensure the window's geometry is up-to-date
         width = self.winfo_width()
         height = self.winfo_height()
         config.save_window_size(width, height)
-
-        for pid in self.xterm_processes.values():
-            try:
-                subprocess.run(["kill", "-15", str(pid)]) # Try graceful termination
-                time.sleep(0.1)
-                subprocess.run(["kill", "-9", str(pid)])  # Force kill if needed
-            except FileNotFoundError:
-                pass
-            except subprocess.CalledProcessError:
-                pass
+        config.flush()
+        self.checkpoint_workspace()
+        workspace.state.flush()
+
+        # Hide the window right away and terminate every session on a worker
+        self.withdraw()
+        self.reaper.close()
+        if self.connection_watcher:
+            self.connection_watcher.close()
+        if self.prober:
+            self.prober.close()
+        processes = self.sessions.processes() + self.launcher.close()
+        if self.askpass:
+            self.askpass.close()
+        if self.xterm_pool:
+            processes += self.xterm_pool.processes()
+        worker = terminate.terminate_in_background(processes, config.get_shutdown_grace())
+        self._finish_closing(worker)
+
+    def offer_restore(self):
+        previous = workspace.saved()
+        count = sum(1 for unique_id in previous['tabs'] if unique_id in self.connections_data)
+        mode = config.settings.get_str("restore_sessions", "ask")  # ask, always or never
+        if not count or mode == "never":
+            return
+        if mode == "always":
+            self.restore_workspace(previous)
+            return
+        self.restore_bar = workspace.RestoreBar(self.right_frame, count, lambda: self.restore_workspace(previous), self.dismiss_restore)
+        self.restore_bar.pack(side=tk.TOP, fill=tk.X, before=self.notebook)
+
+    def dismiss_restore(self):
+        if self.restore_bar is not None:
+            self.restore_bar.destroy()
+            self.restore_bar = None
+
+    def restore_workspace(self, previous):
+        """Reopens the saved tabs in order; the launch pipeline spawns and embeds them in the background."""
+        self.dismiss_restore()
+        restored = 0
+        for index, unique_id in enumerate(previous['tabs']):
+            if unique_id not in self.connections_data:
+                continue  # Deleted since the snapshot was taken
+            session = self.launch_connection(unique_id, select=restored == 0 and previous['selected'] is None)
+            if session is None:
+                continue
+            restored += 1
+            if index == previous['selected']:
+                self.notebook.select(session.frame)
+        self.status_var.set(f"Restoring {restored} tabs")
+
+    def checkpoint_workspace(self):
+        # Until the restore offer is answered the saved set is still the one being offered
+        if self.restore_bar is None:
+            workspace.save(workspace.snapshot(self.notebook, self.sessions))
+
+    def _checkpoint_workspace(self):
+        self.checkpoint_workspace()
+        self.after(self.checkpoint_ms, self._checkpoint_workspace)
+
+    def _finish_closing(self, worker):
+        if worker.is_alive():
+            self.after(20, self._finish_closing, worker)
+            return
+        if self.xterm_pool:
+            self.xterm_pool.close()
+        self.x11.close()
         self.destroy()
 
-    def create_xterm_process(self, tab_name, command_to_run, unique_id, connection_info=None):
+    def xterm_args(self, title, font):
+        font_family, font_size = font
+        return ["xterm", "-xrm", "XTerm.vt100.allowTitleOps:false", "-T", title, "-fa", font_family, "-fs", str(font_size)]
+
+    def create_xterm_process(self, tab_name, command_to_run, unique_id, connection_info=None, select=True):
         if platform.system() == "Linux":
             content_frame = ttk.Frame(self.notebook)
             content_frame.pack(fill=tk.BOTH, expand=True)
@@ -126,213 +434,306 @@ class TabbedInterface(tk.Tk):
             content_frame.grid_rowconfigure(0, weight=1)
 
             self.notebook.add(content_frame, text=tab_name)
-            self.notebook.select(content_frame)
-            # Store a dictionary containing all info
-            self.tab_content_frames[content_frame] = {'unique_id': unique_id, 'tab_name': tab_name, **(connection_info if connection_info else {})}
-            self.after(50, lambda current_tab=content_frame: reparent_and_send_command(current_tab))
-
-            xterm_title = f"{unique_id}"
+            if select:
+                self.notebook.select(content_frame)
+            # The session refers to the shared connection record; its id names the xterm window
+            session = self.sessions.create(unique_id, connection_info, tab_name, content_frame)
+            session.launch_started = tracing.now_ns()
+            session_id = session.session_id
             try:
-                font_family = self.default_font['family']
-                font_size = self.default_font['size']
-                xterm_args = ["xterm", "-xrm", "XTerm.vt100.allowTitleOps:false", "-T", xterm_title, "-fa", font_family, "-fs", str(font_size)]
+                font = (self.default_font['family'], self.default_font['size'])
                 env = os.environ.copy()  # Copy the current environment
 
-                if connection_info and connection_info.get('type') == 'SSH' and connection_info.get('auth.type') == 'Username/Password' and connection_info.get('auth.password'):
-                    password = connection_info['auth.password']
-                    username = connection_info.get('auth.username', '')
-                    hostname = connection_info.get('host', '')
-                    full_hostname = f"{username}@{hostname}" if username else hostname
-                    # xterm_command = f"env SSHPASS='{password}' sshpass -e ssh -o StrictHostKeyChecking=no {full_hostname}"
-                    # full_command = xterm_args + ["-e", f"{xterm_command}"]
-                    # process = subprocess.Popen(full_command, env=env)
-                    try:
-                        temp_script_file = tempfile.NamedTemporaryFile(mode='w', delete=False) # delete=False
-                        script_content = f"#!/bin/bash\n"
-                        script_content += f"export SSHPASS='{password}'\n"
-                        script_content += f"sshpass -e ssh -o StrictHostKeyChecking=no '{full_hostname}'\n"
-                        temp_script_file.write(script_content)
-                        temp_script_file.flush()
-                        os.chmod(temp_script_file.name, 0o700)  # Make the script executable
-                        full_command = xterm_args + ["-e", f"bash '{temp_script_file.name}'"]
-                        process = subprocess.Popen(full_command, env=env, preexec_fn=lambda: os.close(temp_script_file.fileno())) # Close our handle
-                    except Exception as e:
-                        print(f"Error creating temporary script: {e}")
-                        if temp_script_file:
-                            os.remove(temp_script_file.name) # Ensure cleanup on error
-                    self.after(1000, os.remove, temp_script_file.name)
-
-                elif connection_info and connection_info.get('type') == 'SSH':
-                    # Default SSH command without sshpass
+                session_env = {}
+                if connection_info and connection_info.get('type') == 'SSH':
                     username = connection_info.get('auth.username', '')
                     hostname = connection_info.get('host', '')
                     target = f"{username}@{hostname}" if username and hostname else hostname
-                    ssh_command = f"ssh -o StrictHostKeyChecking=no {target}" if target else "ssh -o StrictHostKeyChecking=no"
-                    full_command = xterm_args + ["-e", ssh_command]
-                    process = subprocess.Popen(full_command, env=env)
+                    ssh_argv = self.ssh_command(target, session)
+                    password = connection_info.get('auth.password') if connection_info.get('auth.type') in PASSWORD_AUTH_TYPES else None
+                    if password and self.askpass:
+                        # ssh fetches the password from the broker; nothing touches the disk
+                        session.askpass_token = self.askpass.issue(password)
+                        session_env = self.askpass.environment(session.askpass_token)
+                        # Go straight to password auth so no key passphrase prompt comes first
+                        ssh_argv[1:1] = ["-o", "PreferredAuthentications=keyboard-interactive,password",
+                                         "-o", "NumberOfPasswordPrompts=1"]
+                    session_command = shlex.join(ssh_argv)
                 elif connection_info and connection_info.get('type') == "RDP":
                     host = connection_info.get('host')
-                    rdp_command = f"rdesktop {host}"
-                    full_command = xterm_args + ["-e", rdp_command]
-                    print(f"Popen command (RDP): {full_command}")
-                    process = subprocess.Popen(full_command, env=env)
+                    session_command = f"rdesktop {host}"
                 elif connection_info and connection_info.get('type') == "VNC":
                     host = connection_info.get('host')
-                    vnc_command = f"vncviewer {host}"
-                    full_command = xterm_args + ["-e", vnc_command]
-                    process = subprocess.Popen(full_command, env=env)
+                    session_command = f"vncviewer {host}"
+                else:
+                    session_command = command_to_run
+
+                native = self.terminal_backend(connection_info) == "native"
+                warm = self.xterm_pool.claim(font) if self.xterm_pool and not native else None
+                # A warm xterm's environment is fixed, so session variables go on the command line
+                warm_command = shlex.join(["env"] + [f"{k}={v}" for k, v in session_env.items()]) + " " + session_command if session_env else session_command
+                if warm and not self.xterm_pool.start(warm, warm_command):
+                    warm = None
+                if native:
+                    # In-process terminal on a pty: no X client and no window to embed
+                    import term_view
+                    session.view = term_view.TerminalView(content_frame, font,
+                                                          scrollback=config.settings.get_int("terminal_scrollback", 10000),
+                                                          fps=config.settings.get_int("terminal_fps", 60))
+                    session.view.pack(fill=tk.BOTH, expand=True)
+                    env.update(session_env)
+                    env['TERM'] = "xterm-256color"
+                    argv, popen_kwargs = session.view.command(["/bin/sh", "-c", f"exec {session_command or os.environ.get('SHELL', '/bin/sh')}"])
+                    self.launcher.spawn(session_id, argv, env,
+                                        lambda process, session=session: self.on_terminal_spawned(session, process),
+                                        lambda error, session=session: self.on_xterm_spawn_failed(session, error),
+                                        **popen_kwargs)
+                    if select:
+                        session.view.focus_set()
+                elif warm:
+                    # Move the already mapped xterm running our command into the tab
+                    self.x11.window_ids[session_id] = warm.window_id
+                    self.x11.reparent(session_id, content_frame.winfo_id())
+                    self.sessions.set_window(session, warm.window_id)
+                    launch_done = tracing.now_ns()
+                    self.xterm_pool.record('warm', (launch_done - session.launch_started) / 1e9)
+                    tracing.record("session.launch", session.launch_started, launch_done, mode='warm')
+                    self.after_idle(self.force_xterm_resize, content_frame)
+                    self.after(500, self.xterm_pool.fill, font)
+                    self.sessions.set_process(session, warm.process)
+                    self.monitor_xterm_process(session_id, warm.process)
                 else:
-                    full_command = xterm_args + ["-e", command_to_run]
-                    process = subprocess.Popen(full_command, env=env)
-
-                pid = process.pid
-                self.xterm_processes[unique_id] = process
-                self.monitor_xterm_process(unique_id, process)
-
-                def reparent_and_send_command(tab):
-                    tab_info = self.tab_content_frames.get(tab)
-                    if tab_info:
-                        current_unique_id = tab_info['unique_id']
-                        content_frame_id = str(tab.winfo_id())
-                        try:
-                            time.sleep(0.2)
-                            output = subprocess.check_output(["xdotool", "search", "--name", f"^{current_unique_id}$"], text=True)
-                            window_ids = output.strip().split('\n')
-                            if window_ids:
-                                xterm_wid = window_ids[0]
-                                subprocess.run(["xdotool", "windowreparent", xterm_wid, content_frame_id])
-                                self.after(50, lambda current_tab=tab: self.force_xterm_resize(current_tab))
-                        except FileNotFoundError:
-                            print("Warning: xdotool not found.")
-                        except subprocess.CalledProcessError as e:
-                            print(f"Warning: xdotool failed: {e}")
-                    else:
-                        print("Warning: Could not find tab info for tab.")
+                    # Spawn on a pipeline worker; the tab is attached when the process exists
+                    frame_id = content_frame.winfo_id()
+                    env.update(session_env)
+                    full_command = self.xterm_args(session_id, font)
+                    if self.embed_into:
+                        full_command += ["-into", str(frame_id)]
+                    self.launcher.spawn(session_id, full_command + ["-e", session_command], env,
+                                        lambda process, session=session: self.on_xterm_spawned(session, process),
+                                        lambda error, session=session: self.on_xterm_spawn_failed(session, error))
 
                 content_frame.bind("<Configure>", lambda event, current_tab=content_frame: self.on_tab_resize(current_tab, event))
+                return session
 
-            except FileNotFoundError:
-                tk.messagebox.showerror("Error", "xterm not found.")
-                self.notebook.forget(content_frame)
-                del self.xterm_processes[unique_id]
-                del self.tab_content_frames[content_frame]
+            except (FileNotFoundError, OSError) as e:
+                self.on_xterm_spawn_failed(session, e)
         elif platform.system() == "Windows":
-            tk.messagebox.showerror("Unsupported Platform", "Launching external terminals is primarily for Linux.")
+            messagebox.showerror("Unsupported Platform", "Launching external terminals is primarily for Linux.")
         elif platform.system() == "Darwin":  # macOS
-            tk.messagebox.showerror("Unsupported Platform", "Launching external terminals is primarily for Linux.")
+            messagebox.showerror("Unsupported Platform", "Launching external terminals is primarily for Linux.")
         else:
-            tk.messagebox.showerror("Unsupported Platform", f"Launching external terminals is not supported on {platform.system()}.")
+            messagebox.showerror("Unsupported Platform", f"Launching external terminals is not supported on {platform.system()}.")
+        return None
+
+    def on_xterm_spawned(self, session, process):
+        if self.sessions.get(session.session_id) is None:
+            # Tab was closed while the process was being spawned
+            terminate.terminate_in_background([process], config.get_shutdown_grace())
+            return
+        self.sessions.set_process(session, process)
+        self.monitor_xterm_process(session.session_id, process)
+        self.embedder.track(session.session_id, process.pid, session.session_id, session.frame.winfo_id(), self.embed_into,
+                            lambda key, session=session: self.on_xterm_embedded(session),
+                            lambda key, session=session: self.on_xterm_embed_failed(session))
+
+    def on_terminal_spawned(self, session, process):
+        if self.sessions.get(session.session_id) is None:
+            terminate.terminate_in_background([process], config.get_shutdown_grace())
+            return
+        session.view.attach(process)
+        self.sessions.set_process(session, process)
+        self.monitor_xterm_process(session.session_id, process)
+        self.launcher.settle(session.session_id)
+        tracing.record("session.launch", session.launch_started, tracing.now_ns(), mode='native')
+        self.force_xterm_resize(session.frame)
+
+    def terminal_backend(self, connection_info):
+        """'xterm' or 'native'; terminal_backend is either one value or a {connection type: backend} map."""
+        backend = config.settings.get("terminal_backend", "xterm")
+        if isinstance(backend, dict):
+            backend = backend.get((connection_info or {}).get('type', ''), backend.get('default', "xterm"))
+        if backend == "native":
+            import term_view
+            if not term_view.available():
+                return "xterm"  # Without setsid the pty can't be made the child's terminal safely
+        return backend if backend in ("xterm", "native") else "xterm"
+
+    def on_xterm_spawn_failed(self, session, error):
+        if not self.end_session(session):
+            return
+        message = "xterm not found." if isinstance(error, FileNotFoundError) else f"Error starting session: {error}"
+        self.status_var.set(f"{session.tab_name}: {message}")
+        # A batch launch can fail many tabs at once; show one dialog, not one per tab
+        if not self.spawn_error_shown:
+            self.spawn_error_shown = True
+            messagebox.showerror("Error", message)
+            self.spawn_error_shown = False
+
+    def revoke_credentials(self, session):
+        if self.askpass and session.askpass_token:
+            self.askpass.revoke(session.askpass_token)
+        session.askpass_token = None
+
+    def on_xterm_embedded(self, session):
+        launch_done = tracing.now_ns()
+        tracing.record("session.launch", session.launch_started, launch_done, mode='cold')
+        if self.xterm_pool:
+            self.xterm_pool.record('cold', (launch_done - session.launch_started) / 1e9)
+        self.launcher.settle(session.session_id)
+        self.sessions.set_window(session, self.x11.window_ids.get(session.session_id))
+        self.force_xterm_resize(session.frame)
+
+    def on_xterm_embed_failed(self, session):
+        self.launcher.settle(session.session_id)
+        print(f"Warning: Could not find xterm window for {session.session_id}")
+        self.status_var.set(f"{session.tab_name}: terminal window did not appear")
 
     def get_xterm_title(self, tab_frame):
-        tab_info = self.tab_content_frames.get(tab_frame)
-        if tab_info:
-            return tab_info['unique_id']
+        session = self.sessions.for_frame(tab_frame)
+        if session:
+            return session.session_id
         return None
 
+    def end_session(self, session):
+        """Removes a session's tab and bookkeeping; returns False if it was already gone."""
+        if not self.sessions.remove(session):
+            return False
+        self.launcher.cancel(session.session_id)
+        self.embedder.cancel(session.session_id)
+        self.x11.forget(session.session_id)
+        self.resize_scheduler.forget(session.frame)
+        if str(session.frame) in self.notebook.tabs(): # Check if tab is still in notebook
+            self.notebook.forget(session.frame)
+        self.release_ssh_target(session)
+        self.revoke_credentials(session)
+        if session.view is not None:
+            session.view.close()
+        return True
+
     def close_tab(self, tab_to_close):
-        tab_info = self.tab_content_frames.get(tab_to_close)
-        if tab_info:
-            unique_id = tab_info['unique_id']
-            if unique_id in self.xterm_processes:
-                process = self.xterm_processes[unique_id]
-                try:
-                    subprocess.run(["kill", "-15", str(process.pid)])
-                    time.sleep(0.1)
-                    subprocess.run(["kill", "-9", str(process.pid)])
-                except FileNotFoundError:
-                    pass
-                except subprocess.CalledProcessError:
-                    pass
-                del self.xterm_processes[unique_id]
-            self.notebook.forget(tab_to_close)
-            del self.tab_content_frames[tab_to_close]
-
-    def monitor_xterm_process(self, tab_name, process):
-        self.after(50, self._check_process, tab_name, process)
-
-    def _check_process(self, unique_id, process):
-        if process.poll() is not None:
-            # Process has finished
-            tab_to_remove = None
-            for frame, info in self.tab_content_frames.items():
-                if info['unique_id'] == unique_id:
-                    tab_to_remove = frame
-                    break
-            if tab_to_remove:
-                if tab_to_remove in self.notebook.winfo_children(): # Check if tab is still in notebook
-                    self.notebook.forget(tab_to_remove)
-                if tab_to_remove in self.tab_content_frames:
-                    del self.tab_content_frames[tab_to_remove]
-            if unique_id in self.xterm_processes:
-                del self.xterm_processes[unique_id]
+        session = self.sessions.for_frame(tab_to_close)
+        if session:
+            if session.process is not None:
+                self.reaper.unwatch(session.process.pid)
+                terminate.terminate_in_background([session.process], config.get_shutdown_grace())
+            self.end_session(session)
+
+    def monitor_xterm_process(self, session_id, process):
+        self.reaper.watch(session_id, process)
+
+    def _on_process_exit(self, session_id, returncode):
+        session = self.sessions.get(session_id)
+        if session is None:
+            return
+        self.end_session(session)
+        if returncode == 0:
+            self.status_var.set(f"{session.tab_name} closed")
         else:
-            # Process is still running, check again after 100ms
-            self.after(50, self._check_process, unique_id, process)
+            self.status_var.set(f"{session.tab_name} exited with status {returncode}")
 
     def on_treeview_doubleclick(self, event):
-        item_id = self.connections_tree.selection()
-        if item_id:
-            selected_item_label = self.connections_tree.item(item_id[0], 'text')
-            unique_id = self.connections_tree.item(item_id[0], 'values')[0]
-
-            if selected_item_label != "Connections" and unique_id:
-                connection_file_path = os.path.join(connections.CONNECTION_FILES_DIR, f"{unique_id}.gemTerm")
-                connection_info = {}
-                try:
-                    with open(connection_file_path, 'r') as f:
-                        for line in f:
-                            if '=' in line:
-                                key, value = line.strip().split('=', 1)
-                                connection_info[key] = value
-
-                    self.create_xterm_process(selected_item_label, "", unique_id, connection_info) # Pass the entire connection_info
-
-                except FileNotFoundError:
-                    tk.messagebox.showerror("Error", f"Connection file not found for {selected_item_label}")
-                except Exception as e:
-                    tk.messagebox.showerror("Error", f"Error reading connection file for {selected_item_label}: {e}")
+        # Double-clicking a folder only toggles it; connections in the selection are launched
+        self.launch_connections(self.selected_connection_ids())
+
+    def selected_connection_ids(self):
+        unique_ids = []
+        for item_id in self.connections_tree.selection():
+            values = self.connections_tree.item(item_id, 'values')
+            unique_id = values[0] if values else ''
+            if unique_id:
+                unique_ids.append(unique_id)
+        return unique_ids
+
+    def on_treeview_menu(self, event):
+        item_id = self.connections_tree.identify_row(event.y)
+        if not item_id:
+            return
+        if item_id not in self.connections_tree.selection():
+            self.connections_tree.selection_set(item_id)
+        self.tree_menu.delete(0, tk.END)
+        selected = self.selected_connection_ids()
+        if selected:
+            label = "Open" if len(selected) == 1 else f"Open {len(selected)} Selected"
+            self.tree_menu.add_command(label=label, command=lambda: self.launch_connections(selected))
+        if item_id.startswith(connection_tree.FOLDER_PREFIX):
+            path = item_id[len(connection_tree.FOLDER_PREFIX):]
+            folder_ids = self.connection_tree.folder_connections(path)
+            self.tree_menu.add_command(label=f"Open All in Folder ({len(folder_ids)})",
+                                       command=lambda: self.launch_connections(folder_ids, confirm=True),
+                                       state=tk.NORMAL if folder_ids else tk.DISABLED)
+        if self.tree_menu.index(tk.END) is not None:
+            self.tree_menu.tk_popup(event.x_root, event.y_root)
+
+    def launch_connections(self, unique_ids, confirm=False):
+        """Opens a tab per connection; the launch pipeline spawns them concurrently."""
+        if not unique_ids:
+            return []
+        if confirm and len(unique_ids) > BATCH_CONFIRM_THRESHOLD:
+            if not messagebox.askyesno("Open Connections", f"Open {len(unique_ids)} sessions?"):
+                return []
+        # Only the first tab of a batch is brought to the front
+        launched = [self.launch_connection(unique_id, select=index == 0) for index, unique_id in enumerate(unique_ids)]
+        if len(unique_ids) > 1:
+            self.status_var.set(f"Opening {len(unique_ids)} sessions")
+        return [session for session in launched if session is not None]
+
+    def launch_connection(self, unique_id, select=True):
+        # connections_data is kept current by the directory watcher, so no file is re-read here
+        connection_info = self.connections_data.get(unique_id)
+        if connection_info is None:
+            messagebox.showerror("Error", f"Connection not found: {unique_id}")
+            return None
+        try:
+            return self.create_xterm_process(connection_info['label'], "", unique_id, connection_info, select=select) # Pass the entire connection_info
+        except Exception as e:
+            messagebox.showerror("Error", f"Error launching {connection_info.get('label', unique_id)}: {e}")
+            return None
+
+    def on_tab_changed(self, event=None):
+        selected = self.notebook.select()
+        session = self.sessions.for_frame(self.notebook.nametowidget(selected)) if selected else None
+        if session and session.view is not None:
+            session.view.focus_set()
 
     def on_tab_resize(self, tab_frame, event):
         if platform.system() == "Linux":
-            tab_info = self.tab_content_frames.get(tab_frame)
-            if tab_info:
-                unique_id = tab_info['unique_id']
-                try:
-                    tab_width = event.width
-                    tab_height = event.height
-                    output = subprocess.check_output(["xdotool", "search", "--name", f"^{unique_id}$"], text=True)
-                    window_ids = output.strip().split('\n')
-                    if window_ids:
-                        xterm_wid = window_ids[0]
-                        subprocess.run(["xdotool", "windowsize", xterm_wid, str(tab_width), str(tab_height)])
-                except FileNotFoundError:
-                    print("Warning: xdotool not found. Resizing might not work.")
-                except subprocess.CalledProcessError as e:
-                    print(f"Warning: xdotool failed to resize window: {e}")
+            self.resize_scheduler.request(tab_frame, event.width, event.height)
+
+    def resize_xterm(self, tab_frame, width, height):
+        session = self.sessions.for_frame(tab_frame)
+        if session and session.view is not None:
+            return session.view.resize(width, height)
+        if session:
+            return self.x11.resize(session.session_id, width, height)
+        return False
 
     def force_xterm_resize(self, tab_frame):
         if platform.system() == "Linux":
-            tab_info = self.tab_content_frames.get(tab_frame)
-            if tab_info:
-                unique_id = tab_info['unique_id']
-                if unique_id in self.xterm_processes:
-                    tab_width = tab_frame.winfo_width()
-                    tab_height = tab_frame.winfo_height()
-                    try:
-                        output = subprocess.check_output(["xdotool", "search", "--name", f"^{unique_id}$"], text=True)
-                        window_ids = output.strip().split('\n')
-                        if window_ids:
-                            xterm_wid = window_ids[0]
-                            subprocess.run(["xdotool", "windowsize", xterm_wid, str(tab_width), str(tab_height)]) # Ensure width and height are strings
-                    except FileNotFoundError:
-                        print("Warning: xdotool not found. Forced resizing might not work.")
-                    except subprocess.CalledProcessError as e:
-                        print(f"Warning: xdotool failed to force resize window: {e}")
+            session = self.sessions.for_frame(tab_frame)
+            if session:
+                if session.process is not None:
+                    self.resize_scheduler.invalidate(tab_frame)
+                    self.resize_scheduler.request(tab_frame, tab_frame.winfo_width(), tab_frame.winfo_height())
                 else:
-                    print(f"Warning: No xterm process found for unique ID: {unique_id}") # Debug
+                    print(f"Warning: No xterm process found for session: {session.session_id}") # Debug
             else:
                 print(f"Warning: No tab info found for frame: {tab_frame}") # Debug
 
+def print_startup_profile():
+    """Prints the startup phases recorded in tracing, in the order they started."""
+    phases = sorted(((start_ns, name, duration_ns, attrs) for name, start_ns, duration_ns, _, attrs in tracing.spans()
+                     if name.startswith("startup.") or name == "connections.load"), key=lambda phase: phase[0])
+    print("gemTerm startup (ms since the first import):")
+    for start_ns, name, duration_ns, attrs in phases:
+        details = " ".join(f"{key}={value}" for key, value in attrs.items())
+        print(f"  {(start_ns - IMPORT_STARTED_NS) / 1e6:8.1f}  {name:<22} {duration_ns / 1e6:8.1f} ms  {details}".rstrip())
+
+
 if __name__ == "__main__":
-    app = TabbedInterface()
+    parser = argparse.ArgumentParser(description="gemTerm connection manager")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print import and initialization phase timings once startup finishes")
+    args = parser.parse_args()
+    app = TabbedInterface(profile_startup=args.profile_startup)
     app.mainloop()
\ No newline at end of file
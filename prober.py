@@ -0,0 +1,121 @@
+# prober.py
+import asyncio
+import queue
+import threading
+import time
+
+DEFAULT_PORTS = {'SSH': 22, 'RDP': 3389, 'VNC': 5900}
+
+
+def probe_address(connection_data):
+    """Returns the (host, port) to TCP-probe for a connection, or None."""
+    host = connection_data.get('host', '').strip()
+    if not host:
+        return None
+    conn_type = connection_data.get('type', 'SSH')
+    port = DEFAULT_PORTS.get(conn_type, 22)
+    if host.startswith('[') and ']' in host:
+        # [v6addr]:port
+        address, _, rest = host[1:].partition(']')
+        if rest.startswith(':') and rest[1:].isdigit():
+            port = int(rest[1:])
+        return address, port
+    if host.count(':') == 1:
+        address, _, suffix = host.partition(':')
+        if suffix.isdigit():
+            number = int(suffix)
+            # vncviewer host:N means display N unless N is already a port
+            port = DEFAULT_PORTS['VNC'] + number if conn_type == 'VNC' and number < 100 else number
+        return address, port
+    return host, port
+
+
+class ReachabilityProber:
+    """TCP connect probes run on an asyncio loop in a background thread.
+
+    probe() returns immediately: fresh results come from a TTL cache, the rest
+    are queued on the loop with a concurrency limit and a per-host timeout.
+    Finished results are collected on the Tk thread with results().
+    """
+
+    def __init__(self, concurrency=256, timeout=2.0, ttl=120.0):
+        self.timeout = timeout
+        self.ttl = ttl
+        self.cache = {}  # (host, port) -> (up, expires)
+        self.inflight = {}  # (host, port) -> set of keys waiting for it
+        self.lock = threading.Lock()
+        self.done = queue.Queue()  # (key, up)
+        self.loop = asyncio.new_event_loop()
+        self.semaphore = None
+        self.concurrency = concurrency
+        self.thread = threading.Thread(target=self._run_loop, daemon=True)
+        self.thread.start()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        self.loop.run_forever()
+        self.loop.close()
+
+    def cached(self, address):
+        with self.lock:
+            entry = self.cache.get(address)
+        if entry and entry[1] > time.monotonic():
+            return entry[0]
+        return None
+
+    def probe(self, items):
+        """items: iterable of (key, (host, port)). Returns {key: up} for cache hits."""
+        hits = {}
+        to_start = []
+        now = time.monotonic()
+        with self.lock:
+            for key, address in items:
+                entry = self.cache.get(address)
+                if entry and entry[1] > now:
+                    hits[key] = entry[0]
+                elif address in self.inflight:
+                    self.inflight[address].add(key)
+                else:
+                    self.inflight[address] = {key}
+                    to_start.append(address)
+        if to_start:
+            asyncio.run_coroutine_threadsafe(self._probe_many(to_start), self.loop)
+        return hits
+
+    async def _probe_many(self, addresses):
+        await asyncio.gather(*(self._probe_one(address) for address in addresses))
+
+    async def _probe_one(self, address):
+        up = False
+        try:
+            async with self.semaphore:
+                _, writer = await asyncio.wait_for(asyncio.open_connection(*address), self.timeout)
+                writer.close()
+                up = True
+        except Exception:
+            pass  # Unreachable, timed out, or an unusable host name (e.g. UnicodeError from IDNA)
+        finally:
+            # Always settle the address, or pending() would keep the result poll running
+            with self.lock:
+                self.cache[address] = (up, time.monotonic() + self.ttl)
+                keys = self.inflight.pop(address, ())
+            for key in keys:
+                self.done.put((key, up))
+
+    def pending(self):
+        with self.lock:
+            return bool(self.inflight) or not self.done.empty()
+
+    def results(self, limit=1000):
+        """Returns up to limit finished (key, up) pairs without blocking."""
+        finished = []
+        try:
+            while len(finished) < limit:
+                finished.append(self.done.get_nowait())
+        except queue.Empty:
+            pass
+        return finished
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
@@ -0,0 +1,81 @@
+# quick_connect.py
+import tkinter as tk
+from tkinter import ttk
+
+MAX_RESULTS = 50
+
+
+class QuickConnectBar(ttk.Frame):
+    """Ctrl+K search box over all connections; Enter launches the selection."""
+
+    def __init__(self, parent, index, connections_data, launch):
+        super().__init__(parent)
+        self.index = index
+        self.connections_data = connections_data
+        self.launch = launch  # callable(unique_id)
+        self.last_query = None
+        self.last_results = None
+        self.shown = []
+
+        self.query_var = tk.StringVar(self)
+        self.entry = ttk.Entry(self, textvariable=self.query_var)
+        self.entry.pack(fill=tk.X)
+        self.results = tk.Listbox(self, height=10, activestyle='dotbox', exportselection=False)
+        self.results.pack(fill=tk.BOTH, expand=True)
+
+        self.query_var.trace_add("write", lambda *args: self.update_results())
+        self.entry.bind("<Return>", self.on_enter)
+        self.entry.bind("<Escape>", lambda event: self.hide())
+        self.entry.bind("<Down>", lambda event: self.move_selection(1))
+        self.entry.bind("<Up>", lambda event: self.move_selection(-1))
+        self.results.bind("<Double-1>", self.on_enter)
+        self.results.bind("<Return>", self.on_enter)
+        self.results.bind("<Escape>", lambda event: self.hide())
+
+    def show(self, before=None):
+        if not self.winfo_ismapped():
+            self.pack(side=tk.TOP, fill=tk.X, padx=5, pady=(0, 5), before=before)
+        self.query_var.set("")
+        self.entry.focus_set()
+
+    def hide(self):
+        self.pack_forget()
+        self.last_query = None
+        self.last_results = None
+
+    def update_results(self):
+        query = self.query_var.get()
+        candidates = None
+        # A query that only grew can only match a subset of the previous results
+        if self.last_results is not None and self.last_query and query.startswith(self.last_query):
+            candidates = self.last_results
+        matches = self.index.search(query, candidates)
+        self.last_query, self.last_results = query, matches
+
+        self.shown = self.index.rank(matches, MAX_RESULTS)
+        self.results.delete(0, tk.END)
+        for unique_id in self.shown:
+            data = self.connections_data.get(unique_id, {})
+            self.results.insert(tk.END, f"{data.get('label', '')}  ({data.get('type', '')} {data.get('host', '')})")
+        if self.shown:
+            self.results.selection_set(0)
+            self.results.activate(0)
+
+    def move_selection(self, step):
+        if not self.shown:
+            return "break"
+        current = self.results.curselection()
+        position = min(max((current[0] if current else -1) + step, 0), len(self.shown) - 1)
+        self.results.selection_clear(0, tk.END)
+        self.results.selection_set(position)
+        self.results.activate(position)
+        self.results.see(position)
+        return "break"
+
+    def on_enter(self, event=None):
+        current = self.results.curselection()
+        if self.shown:
+            unique_id = self.shown[current[0] if current else 0]
+            self.hide()
+            self.launch(unique_id)
+        return "break"
@@ -0,0 +1,90 @@
+# reaper.py
+import os
+import signal
+import tkinter as tk
+import tracing
+
+
+class ChildReaper:
+    """Reports child process exits to the Tk thread without polling.
+
+    Each watched process gets a pidfd registered with Tk's file handler, so
+    Tk wakes up only when a child actually exits. On systems without
+    pidfd_open a single SIGCHLD handler writes to a self-pipe instead.
+    """
+
+    def __init__(self, root, on_exit):
+        self.root = root
+        self.on_exit = on_exit  # callable(key, returncode)
+        self.watched = {}  # pid -> (key, process, pidfd or None)
+        self.use_pidfd = hasattr(os, "pidfd_open")
+        self.wakeup_r = None
+        if not self.use_pidfd:
+            self._install_sigchld()
+
+    def _install_sigchld(self):
+        self.wakeup_r, self.wakeup_w = os.pipe()
+        os.set_blocking(self.wakeup_r, False)
+        os.set_blocking(self.wakeup_w, False)
+        signal.signal(signal.SIGCHLD, self._on_sigchld)
+        self.root.tk.createfilehandler(self.wakeup_r, tk.READABLE, self._on_wakeup)
+
+    def watch(self, key, process):
+        pidfd = None
+        if self.use_pidfd:
+            try:
+                pidfd = os.pidfd_open(process.pid)
+            except ProcessLookupError:
+                pass
+            except OSError:
+                # Kernel without pidfd support: switch to the SIGCHLD path for good
+                self.use_pidfd = False
+                if self.wakeup_r is None:
+                    self._install_sigchld()
+        self.watched[process.pid] = (key, process, pidfd)
+        if pidfd is not None:
+            self.root.tk.createfilehandler(pidfd, tk.READABLE, lambda fd, mask, pid=process.pid: self._reap(pid))
+        elif process.poll() is not None:
+            self.root.after_idle(self._reap, process.pid)
+
+    def unwatch(self, pid):
+        entry = self.watched.pop(pid, None)
+        if entry and entry[2] is not None:
+            self.root.tk.deletefilehandler(entry[2])
+            os.close(entry[2])
+        return entry
+
+    def _reap(self, pid):
+        entry = self.watched.get(pid)
+        if entry is None or entry[1].poll() is None:
+            return
+        with tracing.span("process.reap", pid=pid):
+            key, process, _ = self.unwatch(pid)
+            self.on_exit(key, process.returncode)
+
+    def _on_sigchld(self, signum, frame):
+        try:
+            os.write(self.wakeup_w, b"\0")
+        except BlockingIOError:
+            pass
+
+    def _on_wakeup(self, fd, mask):
+        try:
+            while os.read(self.wakeup_r, 512):
+                pass
+        except BlockingIOError:
+            pass
+        # SIGCHLD doesn't say which child exited, but poll() is a cheap waitpid(WNOHANG)
+        for pid, (key, process, pidfd) in list(self.watched.items()):
+            if pidfd is None and process.poll() is not None:
+                self._reap(pid)
+
+    def close(self):
+        for pid in list(self.watched):
+            self.unwatch(pid)
+        if self.wakeup_r is not None:
+            self.root.tk.deletefilehandler(self.wakeup_r)
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+            os.close(self.wakeup_r)
+            os.close(self.wakeup_w)
+            self.wakeup_r = None
@@ -0,0 +1,64 @@
+# resize.py
+
+class ResizeScheduler:
+    """Coalesces <Configure> bursts into one trailing resize per tab frame.
+
+    Only the selected notebook tab is resized while the user drags; other
+    tabs just remember their latest size and get it applied when they are
+    selected.
+    """
+
+    def __init__(self, notebook, apply_resize, delay_ms=40):
+        self.notebook = notebook
+        self.root = notebook.winfo_toplevel()
+        self.apply_resize = apply_resize  # callable(frame, width, height)
+        self.delay_ms = delay_ms
+        self.pending = {}  # frame -> (width, height) not yet applied
+        self.applied = {}  # frame -> (width, height) last sent to the X server
+        self.after_id = None
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed, add="+")
+
+    def _selected_frame(self):
+        selected = self.notebook.select()
+        if not selected:
+            return None
+        return self.notebook.nametowidget(selected)
+
+    def request(self, frame, width, height):
+        self.pending[frame] = (width, height)
+        if frame is self._selected_frame():
+            # Restart the timer so only the trailing event of a burst is applied
+            if self.after_id:
+                self.root.after_cancel(self.after_id)
+            self.after_id = self.root.after(self.delay_ms, self.flush)
+
+    def flush(self):
+        self.after_id = None
+        frame = self._selected_frame()
+        if frame is not None:
+            self._apply(frame)
+
+    def _apply(self, frame):
+        size = self.pending.pop(frame, None)
+        if size is None or self.applied.get(frame) == size:
+            return
+        if self.apply_resize(frame, *size):
+            self.applied[frame] = size
+
+    def on_tab_changed(self, event=None):
+        frame = self._selected_frame()
+        if frame is None:
+            return
+        if frame not in self.pending and frame in self.applied:
+            return
+        if frame not in self.pending:
+            self.pending[frame] = (frame.winfo_width(), frame.winfo_height())
+        self._apply(frame)
+
+    def invalidate(self, frame):
+        """Forces the next request for frame to be sent, e.g. after reparenting."""
+        self.applied.pop(frame, None)
+
+    def forget(self, frame):
+        self.pending.pop(frame, None)
+        self.applied.pop(frame, None)
@@ -0,0 +1,106 @@
+# search.py
+import bisect
+
+SEARCH_FIELDS = ('label', 'host', 'auth.username', 'type')
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TrigramIndex:
+    """In-memory substring index over connection label, host, username and type.
+
+    Each connection's searchable text is split into trigrams; a query term of
+    three or more characters is answered by intersecting the posting sets of
+    its trigrams and then confirming the substring on the few survivors.
+    """
+
+    def __init__(self):
+        self.texts = {}  # unique_id -> lowercased searchable text
+        self.labels = {}  # unique_id -> lowercased label, for ranking
+        self.postings = {}  # trigram -> set of unique_ids
+        self.order = []  # (label, unique_id) kept sorted for ranking large result sets
+
+    def build(self, connections_data):
+        self.texts.clear()
+        self.labels.clear()
+        self.postings.clear()
+        postings = self.postings
+        for unique_id, data in connections_data.items():
+            text = "\n".join(str(data.get(field, '')).lower() for field in SEARCH_FIELDS)
+            self.texts[unique_id] = text
+            self.labels[unique_id] = str(data.get('label', '')).lower()
+            for gram in _trigrams(text):
+                posting = postings.get(gram)
+                if posting is None:
+                    postings[gram] = {unique_id}
+                else:
+                    posting.add(unique_id)
+        self.order = sorted((label, uid) for uid, label in self.labels.items())
+
+    def add(self, unique_id, data):
+        if unique_id in self.texts:
+            self.remove(unique_id)
+        text = "\n".join(str(data.get(field, '')).lower() for field in SEARCH_FIELDS)
+        self.texts[unique_id] = text
+        self.labels[unique_id] = str(data.get('label', '')).lower()
+        bisect.insort(self.order, (self.labels[unique_id], unique_id))
+        for gram in _trigrams(text):
+            self.postings.setdefault(gram, set()).add(unique_id)
+
+    def remove(self, unique_id):
+        text = self.texts.pop(unique_id, None)
+        label = self.labels.pop(unique_id, None)
+        if text is None:
+            return
+        i = bisect.bisect_left(self.order, (label, unique_id))
+        if i < len(self.order) and self.order[i] == (label, unique_id):
+            del self.order[i]
+        for gram in _trigrams(text):
+            posting = self.postings.get(gram)
+            if posting is not None:
+                posting.discard(unique_id)
+                if not posting:
+                    del self.postings[gram]
+
+    def search(self, query, candidates=None):
+        """Returns the set of unique_ids whose text contains every term of query.
+
+        Pass the previous result set as candidates when the query only grew,
+        so narrowing searches never look at the full index again.
+        """
+        terms = query.lower().split()
+        if not terms:
+            return set(self.texts)
+        if candidates is None:
+            # Use the rarest trigram across all long-enough terms to seed the candidates
+            grams = [gram for term in terms if len(term) >= 3 for gram in _trigrams(term)]
+            if grams:
+                postings = sorted((self.postings.get(gram, set()) for gram in grams), key=len)
+                candidates = set(postings[0])
+                for posting in postings[1:]:
+                    if len(candidates) < 64:
+                        break
+                    candidates &= posting
+            else:
+                candidates = self.texts.keys()
+        get_text = self.texts.get
+        if len(terms) == 1:
+            term = terms[0]
+            return {uid for uid in candidates if term in get_text(uid, '')}
+        return {uid for uid in candidates if all(term in get_text(uid, '') for term in terms)}
+
+    def rank(self, unique_ids, limit=50):
+        """Returns up to limit matches ordered by label."""
+        if len(unique_ids) <= limit * 4:
+            labels = self.labels
+            return sorted((uid for uid in unique_ids if uid in labels), key=labels.get)[:limit]
+        # Large result sets: walk the presorted order and stop after limit hits
+        ranked = []
+        for _, uid in self.order:
+            if uid in unique_ids:
+                ranked.append(uid)
+                if len(ranked) >= limit:
+                    break
+        return ranked
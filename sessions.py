@@ -0,0 +1,97 @@
+# sessions.py
+import itertools
+import os
+
+
+class Session:
+    """One open tab. Several sessions may share the same connection."""
+    __slots__ = ('session_id', 'connection_id', 'connection', 'tab_name', 'frame', 'process',
+                 'window_id', 'view', 'ssh_target', 'askpass_token', 'launch_started')
+
+    def __init__(self, session_id, connection_id, connection, tab_name, frame):
+        self.session_id = session_id  # Also the xterm title used to find its window
+        self.connection_id = connection_id
+        self.connection = connection  # The shared record from connections_data, not a copy
+        self.tab_name = tab_name
+        self.frame = frame
+        self.process = None
+        self.window_id = None
+        self.view = None  # TerminalView for the native backend, None for xterm
+        self.ssh_target = None  # Pooled SSH master this session holds a reference on
+        self.askpass_token = None  # One-shot password token; the password itself is never stored here
+        self.launch_started = 0
+
+
+class SessionRegistry:
+    """Open sessions with constant-time lookup by id, tab frame, pid and window id."""
+
+    def __init__(self):
+        # The pid keeps ids from colliding with another gemTerm's xterm titles
+        self.prefix = f"gemterm-{os.getpid()}-"
+        self.counter = itertools.count(1)
+        self.by_id = {}  # session_id -> Session, in opening order
+        self.by_frame = {}
+        self.by_pid = {}
+        self.by_window = {}
+        self.by_connection = {}  # connection_id -> set of session_ids
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def __iter__(self):
+        return iter(list(self.by_id.values()))
+
+    def create(self, connection_id, connection, tab_name, frame):
+        session = Session(f"{self.prefix}{next(self.counter)}", connection_id, connection, tab_name, frame)
+        self.by_id[session.session_id] = session
+        self.by_frame[frame] = session
+        self.by_connection.setdefault(connection_id, set()).add(session.session_id)
+        return session
+
+    def get(self, session_id):
+        return self.by_id.get(session_id)
+
+    def for_frame(self, frame):
+        return self.by_frame.get(frame)
+
+    def for_pid(self, pid):
+        return self.by_pid.get(pid)
+
+    def for_window(self, window_id):
+        return self.by_window.get(window_id)
+
+    def for_connection(self, connection_id):
+        return [self.by_id[session_id] for session_id in self.by_connection.get(connection_id, ())]
+
+    def set_process(self, session, process):
+        if session.process is not None:
+            self.by_pid.pop(session.process.pid, None)
+        session.process = process
+        if process is not None:
+            self.by_pid[process.pid] = session
+
+    def set_window(self, session, window_id):
+        if session.window_id is not None:
+            self.by_window.pop(session.window_id, None)
+        session.window_id = window_id
+        if window_id is not None:
+            self.by_window[window_id] = session
+
+    def processes(self):
+        return [session.process for session in self.by_id.values() if session.process is not None]
+
+    def remove(self, session):
+        """Drops session from every index; returns False if it was already gone."""
+        if self.by_id.pop(session.session_id, None) is None:
+            return False
+        self.by_frame.pop(session.frame, None)
+        if session.process is not None:
+            self.by_pid.pop(session.process.pid, None)
+        if session.window_id is not None:
+            self.by_window.pop(session.window_id, None)
+        siblings = self.by_connection.get(session.connection_id)
+        if siblings is not None:
+            siblings.discard(session.session_id)
+            if not siblings:
+                del self.by_connection[session.connection_id]
+        return True
@@ -0,0 +1,135 @@
+# ssh_pool.py
+import hashlib
+import os
+import subprocess
+import threading
+import time
+import tkinter as tk
+from tkinter import ttk, messagebox
+import tracing
+
+
+class SSHMasterPool:
+    """Per-target OpenSSH ControlMaster connections shared by all tabs.
+
+    The first tab to a target starts a master (ControlMaster=auto) whose socket
+    lives under control_dir; later tabs to the same target ride it and skip
+    TCP, key exchange and authentication. Masters with no open tabs are closed
+    after idle_seconds, and at most max_masters are kept open.
+    """
+
+    def __init__(self, control_dir, max_masters=16, idle_seconds=600):
+        self.control_dir = control_dir
+        self.max_masters = max_masters
+        self.idle_seconds = idle_seconds
+        self.masters = {}  # target -> {'refs': int, 'last_used': float}
+        os.makedirs(self.control_dir, mode=0o700, exist_ok=True)
+
+    def control_path(self, target):
+        # Hashed name keeps the socket path well under the sun_path limit
+        return os.path.join(self.control_dir, hashlib.sha1(target.encode()).hexdigest()[:16])
+
+    def is_alive(self, target):
+        return os.path.exists(self.control_path(target))
+
+    def acquire(self, target):
+        """Returns the ssh options for target and counts one more user of it."""
+        master = self.masters.get(target)
+        if master is None:
+            if len(self.masters) >= self.max_masters and not self._evict_lru():
+                # Pool is full of busy masters: connect without multiplexing
+                return ["-o", "ControlMaster=no", "-o", "ControlPath=none"]
+            master = self.masters[target] = {'refs': 0, 'last_used': time.monotonic()}
+        master['refs'] += 1
+        master['last_used'] = time.monotonic()
+        return ["-o", "ControlMaster=auto",
+                "-o", f"ControlPath={self.control_path(target)}",
+                "-o", f"ControlPersist={self.idle_seconds}s"]
+
+    def release(self, target):
+        master = self.masters.get(target)
+        if master:
+            master['refs'] = max(0, master['refs'] - 1)
+            master['last_used'] = time.monotonic()
+
+    def _evict_lru(self):
+        idle = [(m['last_used'], target) for target, m in self.masters.items() if m['refs'] == 0]
+        if not idle:
+            return False
+        self.evict(min(idle)[1])
+        return True
+
+    def evict(self, target):
+        self.masters.pop(target, None)
+        if not self.is_alive(target):
+            return
+        command = ["ssh", "-O", "exit", "-o", f"ControlPath={self.control_path(target)}", target]
+        # ssh -O exit talks to the master over its socket; keep it off the Tk thread
+        tracing.count("subprocess.spawn")
+        threading.Thread(target=subprocess.run, args=(command,),
+                         kwargs={'stdout': subprocess.DEVNULL, 'stderr': subprocess.DEVNULL}, daemon=True).start()
+
+    def sweep(self):
+        """Closes masters that have had no tabs for idle_seconds."""
+        now = time.monotonic()
+        for target, master in list(self.masters.items()):
+            if master['refs'] == 0 and now - master['last_used'] > self.idle_seconds:
+                self.evict(target)
+            elif master['refs'] == 0 and not self.is_alive(target):
+                # ControlPersist already closed it
+                self.masters.pop(target, None)
+
+    def flush(self, idle_only=True):
+        for target, master in list(self.masters.items()):
+            if not idle_only or master['refs'] == 0:
+                self.evict(target)
+
+    def status(self):
+        now = time.monotonic()
+        return [(target, m['refs'], int(now - m['last_used']), self.is_alive(target))
+                for target, m in sorted(self.masters.items())]
+
+
+def open_ssh_masters(root, pool, tabs_for_target=None):
+    """Opens a window listing the pooled SSH masters.
+
+    tabs_for_target(target) returns the names of the open tabs riding a
+    master; "Close All" lists them and asks before cutting them off.
+    """
+    window = tk.Toplevel(root)
+    window.title("SSH Master Connections")
+
+    tree = ttk.Treeview(window, columns=('tabs', 'idle', 'state'), height=10)
+    tree.heading('#0', text='Target')
+    tree.heading('tabs', text='Tabs')
+    tree.heading('idle', text='Idle (s)')
+    tree.heading('state', text='State')
+    tree.column('tabs', width=50, anchor=tk.E)
+    tree.column('idle', width=70, anchor=tk.E)
+    tree.column('state', width=80)
+    tree.grid(row=0, column=0, columnspan=3, padx=5, pady=5, sticky=(tk.N, tk.S, tk.W, tk.E))
+    window.grid_columnconfigure(0, weight=1)
+    window.grid_rowconfigure(0, weight=1)
+
+    def refresh():
+        tree.delete(*tree.get_children())
+        for target, refs, idle, alive in pool.status():
+            tree.insert("", tk.END, text=target, values=(refs, idle, "open" if alive else "connecting"))
+
+    def flush(idle_only):
+        busy = [(target, refs) for target, refs, _, _ in pool.status() if refs > 0]
+        if not idle_only and busy:
+            lines = []
+            for target, refs in busy:
+                tabs = tabs_for_target(target) if tabs_for_target else []
+                lines.append(f"{target}: {', '.join(tabs)}" if tabs else f"{target}: {refs} tab(s)")
+            message = "Closing these masters disconnects their open tabs:\n\n" + "\n".join(lines) + "\n\nClose them anyway?"
+            if not messagebox.askyesno("Close All Masters", message, parent=window):
+                return
+        pool.flush(idle_only)
+        refresh()
+
+    ttk.Button(window, text="Refresh", command=refresh).grid(row=1, column=0, padx=5, pady=5)
+    ttk.Button(window, text="Close Idle", command=lambda: flush(True)).grid(row=1, column=1, padx=5, pady=5)
+    ttk.Button(window, text="Close All", command=lambda: flush(False)).grid(row=1, column=2, padx=5, pady=5)
+    refresh()
@@ -0,0 +1,307 @@
+# term_view.py
+import fcntl
+import os
+import shutil
+import struct
+import termios
+import time
+import tkinter as tk
+from tkinter import font as tkFont
+import tracing
+import vterm
+
+READ_SIZE = 1 << 16
+READ_BUDGET = 1 << 18  # Bytes parsed per Tk callback before yielding to other events
+SETSID = shutil.which("setsid")
+
+DEFAULT_COLORS = {vterm.DEFAULT_FG: "#000000", vterm.DEFAULT_BG: "#ffffff"}  # xterm's black on white
+BASE_COLORS = ["#000000", "#cd0000", "#00cd00", "#cdcd00", "#0000ee", "#cd00cd", "#00cdcd", "#e5e5e5",
+               "#7f7f7f", "#ff0000", "#00ff00", "#ffff00", "#5c5cff", "#ff00ff", "#00ffff", "#ffffff"]
+
+KEYS = {
+    'Return': "\r", 'BackSpace': "\x7f", 'Tab': "\t", 'ISO_Left_Tab': "\x1b[Z", 'Escape': "\x1b",
+    'Up': "\x1b[A", 'Down': "\x1b[B", 'Right': "\x1b[C", 'Left': "\x1b[D", 'Home': "\x1b[H", 'End': "\x1b[F",
+    'Insert': "\x1b[2~", 'Delete': "\x1b[3~", 'Prior': "\x1b[5~", 'Next': "\x1b[6~",
+    'F1': "\x1bOP", 'F2': "\x1bOQ", 'F3': "\x1bOR", 'F4': "\x1bOS", 'F5': "\x1b[15~", 'F6': "\x1b[17~",
+    'F7': "\x1b[18~", 'F8': "\x1b[19~", 'F9': "\x1b[20~", 'F10': "\x1b[21~", 'F11': "\x1b[23~", 'F12': "\x1b[24~",
+}
+CURSOR_KEYS = {'Up', 'Down', 'Right', 'Left', 'Home', 'End'}
+SHIFT, CONTROL, ALT = 0x1, 0x4, 0x8
+
+
+def available():
+    """True if sessions can be started on a pty (needs util-linux setsid with --ctty)."""
+    return SETSID is not None
+
+
+def _palette():
+    colors = list(BASE_COLORS)
+    levels = [0, 95, 135, 175, 215, 255]
+    colors += [f"#{levels[r]:02x}{levels[g]:02x}{levels[b]:02x}" for r in range(6) for g in range(6) for b in range(6)]
+    colors += [f"#{v:02x}{v:02x}{v:02x}" for v in range(8, 248, 10)]
+    return colors
+
+
+PALETTE = _palette()
+
+
+def color(index):
+    return DEFAULT_COLORS.get(index) or PALETTE[index]
+
+
+def runs(attrs, cols):
+    """Yields (start, end, attr) for runs of cells sharing an attribute."""
+    if attrs is None:
+        yield 0, cols, vterm.DEFAULT_ATTR
+        return
+    start = 0
+    current = attrs[0]
+    for x in range(1, cols):
+        if attrs[x] != current:
+            yield start, x, current
+            start, current = x, attrs[x]
+    yield start, cols, current
+
+
+class TerminalView(tk.Canvas):
+    """In-process terminal: a pty, a vterm.Screen and a canvas that redraws only damaged rows.
+
+    Output is read when Tk reports the pty readable and parsed straight into
+    the screen model. Redraws are coalesced to at most `fps` per second and
+    touch only rows the parser marked dirty. Shift+PageUp/PageDown and the
+    mouse wheel scroll through the bounded scrollback.
+    """
+
+    def __init__(self, parent, font, scrollback=10000, fps=60):
+        super().__init__(parent, background=DEFAULT_COLORS[vterm.DEFAULT_BG], highlightthickness=0, takefocus=True)
+        family, size = font
+        self.fonts = {}
+        for flags in (0, vterm.BOLD, vterm.UNDERLINE, vterm.BOLD | vterm.UNDERLINE):
+            self.fonts[flags] = tkFont.Font(self, family=family, size=size,
+                                            weight='bold' if flags & vterm.BOLD else 'normal',
+                                            underline=bool(flags & vterm.UNDERLINE))
+        self.cell_width = max(1, self.fonts[0].measure("M"))
+        self.cell_height = max(1, self.fonts[0].metrics("linespace"))
+        self.screen = vterm.Screen(24, 80, scrollback)
+        self.parser = vterm.Parser(self.screen, reply=self.write)
+        self.frame_interval = 1.0 / max(1, fps)
+        self.last_draw = 0.0
+        self.redraw_id = None
+        self.offset = 0  # Lines scrolled back into history
+        self.outbox = b""
+        self.flush_id = None
+        self.bytes_read = 0
+        self.process = None
+        self.reading = False
+        self.master, self.slave = os.openpty()
+        os.set_blocking(self.master, False)
+        self._set_winsize()
+        self.cursor_item = self.create_rectangle(0, 0, 0, 0, outline="", tags=("cursor",))
+
+        self.bind("<Key>", self.on_key)
+        self.bind("<Button-1>", lambda event: self.focus_set())
+        self.bind("<Button-4>", lambda event: self.scroll_view(3))
+        self.bind("<Button-5>", lambda event: self.scroll_view(-3))
+        self.bind("<MouseWheel>", lambda event: self.scroll_view(3 if event.delta > 0 else -3))
+        self.bind("<<Paste>>", self.on_paste)
+        self.bind("<FocusIn>", lambda event: self._draw_cursor())
+        self.bind("<FocusOut>", lambda event: self._draw_cursor())
+
+    # Process
+
+    def command(self, argv):
+        """Returns (argv, Popen keyword arguments) that run argv on this view's pty.
+
+        setsid --ctty makes the pty the controlling terminal without a
+        preexec_fn, which is unsafe in the launch pipeline's worker threads;
+        callers check available() first.
+        """
+        if not SETSID:
+            raise RuntimeError("setsid(1) is required for the native terminal backend")
+        kwargs = {'stdin': self.slave, 'stdout': self.slave, 'stderr': self.slave, 'close_fds': True}
+        return [SETSID, "--ctty"] + list(argv), kwargs
+
+    def attach(self, process):
+        """Starts reading output once the child owns the pty."""
+        self.process = process
+        self._close_slave()
+        self.reading = True
+        self.tk.createfilehandler(self.master, tk.READABLE, self._on_readable)
+
+    def _close_slave(self):
+        if self.slave is not None:
+            os.close(self.slave)
+            self.slave = None
+
+    def _on_readable(self, fd, mask):
+        total = 0
+        while total < READ_BUDGET:
+            try:
+                data = os.read(self.master, READ_SIZE)
+            except BlockingIOError:
+                break
+            except OSError:
+                data = b""  # EIO once every process on the pty has exited
+            if not data:
+                self._stop_reading()
+                break
+            self.parser.feed(data)
+            total += len(data)
+        if total:
+            self.bytes_read += total
+            tracing.count("term.bytes", total)
+            if self.offset:
+                # New output snaps the view back to the live screen
+                self.offset = 0
+                self.screen.dirty.update(range(self.screen.rows))
+            self.schedule_redraw()
+
+    def _stop_reading(self):
+        if self.reading:
+            self.reading = False
+            self.tk.deletefilehandler(self.master)
+
+    def write(self, text):
+        if self.master is None:
+            return
+        self.outbox += text.encode() if isinstance(text, str) else text
+        if self.flush_id is None:
+            self._flush_outbox()
+
+    def _flush_outbox(self):
+        self.flush_id = None
+        try:
+            while self.outbox:
+                written = os.write(self.master, self.outbox)
+                self.outbox = self.outbox[written:]
+        except BlockingIOError:
+            self.flush_id = self.after(10, self._flush_outbox)
+        except OSError:
+            self.outbox = b""
+
+    def close(self):
+        self._stop_reading()
+        for after_id in (self.redraw_id, self.flush_id):
+            if after_id:
+                self.after_cancel(after_id)
+        self.redraw_id = self.flush_id = None
+        self._close_slave()
+        if self.master is not None:
+            os.close(self.master)
+            self.master = None
+
+    # Input
+
+    def on_key(self, event):
+        sequence = KEYS.get(event.keysym)
+        if event.state & SHIFT and event.keysym in ('Prior', 'Next'):
+            page = max(1, self.screen.rows - 1)
+            self.scroll_view(page if event.keysym == 'Prior' else -page)
+            return "break"
+        if event.state & SHIFT and event.keysym == 'Insert':
+            return self.on_paste(event)
+        if sequence is not None:
+            if self.screen.app_cursor_keys and event.keysym in CURSOR_KEYS:
+                sequence = "\x1bO" + sequence[-1]
+        elif event.char:
+            sequence = event.char
+        elif event.state & CONTROL and event.keysym in ('space', 'at'):
+            sequence = "\x00"
+        else:
+            return None
+        if event.state & ALT and len(sequence) == 1:
+            sequence = "\x1b" + sequence
+        self.write(sequence)
+        return "break"
+
+    def on_paste(self, event=None):
+        try:
+            text = self.clipboard_get()
+        except tk.TclError:
+            return "break"
+        text = text.replace("\r\n", "\r").replace("\n", "\r")
+        if self.screen.bracketed_paste:
+            text = f"\x1b[200~{text}\x1b[201~"
+        self.write(text)
+        return "break"
+
+    def scroll_view(self, lines):
+        offset = max(0, min(len(self.screen.scrollback), self.offset + lines))
+        if offset != self.offset:
+            self.offset = offset
+            self.screen.dirty.update(range(self.screen.rows))
+            self.schedule_redraw()
+
+    # Geometry
+
+    def _set_winsize(self):
+        winsize = struct.pack("HHHH", self.screen.rows, self.screen.cols,
+                              self.screen.cols * self.cell_width, self.screen.rows * self.cell_height)
+        fcntl.ioctl(self.master, termios.TIOCSWINSZ, winsize)
+
+    def resize(self, width, height):
+        """Fits the screen to a width x height pixel area; the child gets SIGWINCH."""
+        cols = max(2, width // self.cell_width)
+        rows = max(1, height // self.cell_height)
+        if (rows, cols) != (self.screen.rows, self.screen.cols) and self.master is not None:
+            self.screen.resize(rows, cols)
+            self.offset = min(self.offset, len(self.screen.scrollback))
+            self._set_winsize()
+            self.delete("row")
+            self.schedule_redraw()
+        return True
+
+    # Drawing
+
+    def schedule_redraw(self):
+        if self.redraw_id is None:
+            delay = max(0, int((self.last_draw + self.frame_interval - time.monotonic()) * 1000))
+            self.redraw_id = self.after(delay, self.redraw)
+
+    def redraw(self):
+        self.redraw_id = None
+        self.last_draw = time.monotonic()
+        screen = self.screen
+        with tracing.span("term.redraw", rows=len(screen.dirty)):
+            for y in sorted(screen.dirty):
+                if y < screen.rows:
+                    self._draw_row(y)
+            screen.dirty.clear()
+            self._draw_cursor()
+        if screen.bell:
+            screen.bell = False
+            self.bell()
+
+    def _draw_row(self, y):
+        tag = f"r{y}"
+        self.delete(tag)
+        text, attrs = self.screen.display_line(y, self.offset)
+        top = y * self.cell_height
+        bottom = top + self.cell_height
+        for start, end, attr in runs(attrs, self.screen.cols):
+            fg, bg = vterm.attr_fg(attr), vterm.attr_bg(attr)
+            if attr & vterm.REVERSE:
+                fg, bg = (vterm.DEFAULT_BG if fg == vterm.DEFAULT_FG else fg), (vterm.DEFAULT_FG if bg == vterm.DEFAULT_BG else bg)
+            left = start * self.cell_width
+            if bg != vterm.DEFAULT_BG:
+                self.create_rectangle(left, top, end * self.cell_width, bottom, fill=color(bg), outline="", tags=("row", tag))
+            segment = text[start:end]
+            if segment.strip() or attr & vterm.UNDERLINE:
+                self.create_text(left, top, text=segment, anchor=tk.NW, fill=color(fg),
+                                 font=self.fonts[attr & (vterm.BOLD | vterm.UNDERLINE)], tags=("row", tag))
+
+    def _draw_cursor(self):
+        screen = self.screen
+        if not screen.cursor_visible or self.offset:
+            self.coords(self.cursor_item, 0, 0, 0, 0)
+            return
+        left = screen.x * self.cell_width
+        top = screen.y * self.cell_height
+        self.coords(self.cursor_item, left, top, left + self.cell_width - 1, top + self.cell_height - 1)
+        try:
+            focused = self.focus_get() is self
+        except KeyError:  # Focus is in a widget Tkinter didn't create, e.g. a torn-off menu
+            focused = False
+        self.itemconfigure(self.cursor_item, outline=color(vterm.DEFAULT_FG),
+                           fill=color(vterm.DEFAULT_FG) if focused else "", stipple="gray50" if focused else "")
+        self.tag_raise(self.cursor_item)
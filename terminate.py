@@ -0,0 +1,44 @@
+# terminate.py
+import os
+import signal
+import threading
+import time
+
+
+def _signal(process, signum):
+    try:
+        os.kill(process.pid, signum)
+    except ProcessLookupError:
+        pass
+
+
+def terminate_processes(processes, grace_seconds):
+    """Sends SIGTERM to all processes, waits for them together until one
+    shared deadline, then SIGKILLs whatever is still running."""
+    processes = [p for p in processes if p.poll() is None]
+    for process in processes:
+        _signal(process, signal.SIGTERM)
+
+    deadline = time.monotonic() + grace_seconds
+    remaining = processes
+    while remaining and time.monotonic() < deadline:
+        remaining = [p for p in remaining if p.poll() is None]
+        if remaining:
+            time.sleep(min(0.02, max(0, deadline - time.monotonic())))
+
+    for process in remaining:
+        if process.poll() is None:
+            _signal(process, signal.SIGKILL)
+    for process in remaining:
+        try:
+            process.wait(timeout=1)
+        except Exception as e:
+            print(f"Warning: Process {process.pid} did not exit after SIGKILL: {e}")
+    return remaining
+
+
+def terminate_in_background(processes, grace_seconds):
+    """Runs terminate_processes on a worker thread and returns the thread."""
+    worker = threading.Thread(target=terminate_processes, args=(list(processes), grace_seconds), daemon=True)
+    worker.start()
+    return worker
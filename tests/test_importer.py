@@ -0,0 +1,67 @@
+# tests/test_importer.py
+import json
+import os
+import importer
+
+
+def write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+def test_ssh_config_accepts_spaces_tabs_and_equals(tmp_path):
+    path = write(tmp_path, "config",
+                 "Host web1\n"
+                 "\tHostName\t10.0.0.1\n"
+                 "\tUser\tdeploy\n"
+                 "Host db1\n"
+                 "  HostName = 10.0.0.2\n"
+                 "  User=admin\n")
+    records = list(importer.iter_ssh_config(path))
+    assert [(r['label'], r['host'], r['auth.username']) for r in records] == [
+        ("web1", "10.0.0.1", "deploy"), ("db1", "10.0.0.2", "admin")]
+
+
+def test_ssh_config_keeps_equals_inside_values(tmp_path):
+    path = write(tmp_path, "config", "Host a\n  IdentityFile ~/.ssh/id_a=b\n")
+    record, = importer.iter_ssh_config(path)
+    assert record['auth.key_file'] == os.path.expanduser("~/.ssh/id_a=b")
+
+
+def test_ssh_config_skips_patterns_and_keeps_first_value(tmp_path):
+    path = write(tmp_path, "config",
+                 "# comment\n"
+                 "Host *\n  User everyone\n"
+                 "Host one two !three four*\n"
+                 "  HostName shared\n  HostName ignored\n"
+                 "Match host x\n  User nobody\n")
+    records = list(importer.iter_ssh_config(path))
+    assert [(r['label'], r['host'], r['auth.username']) for r in records] == [
+        ("one", "shared", ""), ("two", "shared", "")]
+
+
+def test_csv_lowercases_and_strips_headers(tmp_path):
+    path = write(tmp_path, "hosts.csv", " Name ,HOST,user\nweb,10.0.0.1,deploy\n")
+    assert list(importer.iter_csv(path)) == [{'name': "web", 'host': "10.0.0.1", 'user': "deploy"}]
+
+
+def test_json_array_larger_than_one_read(tmp_path, monkeypatch):
+    monkeypatch.setattr(importer, "READ_SIZE", 16)
+    objects = [{'Name': f"host{i}", 'Host': f"10.0.0.{i}"} for i in range(20)]
+    path = write(tmp_path, "hosts.json", json.dumps(objects))
+    records = list(importer.iter_json(path))
+    assert records == [{'name': f"host{i}", 'host': f"10.0.0.{i}"} for i in range(20)]
+
+
+def test_json_lines_skip_non_objects(tmp_path):
+    path = write(tmp_path, "hosts.jsonl", '{"host": "a"}\n[1, 2]\n{"host": "b"}\n')
+    assert list(importer.iter_json(path)) == [{'host': "a"}, {'host': "b"}]
+
+
+def test_normalize_maps_aliases_and_auth_type():
+    record = {'name': "web", 'address': "10.0.0.1", 'protocol': "rdp", 'password': "pw"}
+    assert importer.normalize(record, "Imported") == {
+        'label': "web", 'host': "10.0.0.1", 'type': "RDP", 'auth.password': "pw",
+        'auth.type': "Password", 'group': "Imported"}
+    assert importer.normalize({'name': "no host"}, "Imported") is None
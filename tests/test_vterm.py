@@ -0,0 +1,194 @@
+# tests/test_vterm.py
+import time
+import vterm
+
+
+def make(rows=4, cols=10, scrollback=100):
+    screen = vterm.Screen(rows, cols, scrollback)
+    return screen, vterm.Parser(screen)
+
+
+def row(screen, y, offset=0):
+    return screen.display_line(y, offset)[0].rstrip()
+
+
+def history(screen):
+    return [text.rstrip() for text, _ in screen.scrollback]
+
+
+def test_long_line_wraps_onto_next_row():
+    screen, parser = make(cols=5)
+    parser.feed(b"abcdefgh")
+    assert [row(screen, y) for y in range(2)] == ["abcde", "fgh"]
+    assert (screen.x, screen.y) == (3, 1)
+
+
+def test_wrap_is_deferred_until_the_next_character():
+    screen, parser = make(cols=5)
+    parser.feed(b"abcde")
+    assert (screen.x, screen.y, screen.wrap_pending) == (4, 0, True)
+    parser.feed(b"\r\n")
+    assert (screen.x, screen.y) == (0, 1)
+    assert row(screen, 1) == ""
+
+
+def test_autowrap_off_overwrites_last_column():
+    screen, parser = make(cols=5)
+    parser.feed(b"\x1b[?7labcdefg")
+    assert row(screen, 0) == "abcdg"
+    assert screen.y == 0
+
+
+def test_wrapping_at_the_bottom_scrolls_into_history():
+    screen, parser = make(rows=2, cols=3)
+    parser.feed(b"abcdefghi")
+    assert history(screen) == ["abc"]
+    assert [row(screen, y) for y in range(2)] == ["def", "ghi"]
+
+
+def test_scroll_region_scrolls_only_its_rows_and_keeps_no_history():
+    screen, parser = make(rows=5)
+    parser.feed(b"top\r\n1\r\n2\r\n3\r\nbottom")
+    parser.feed(b"\x1b[2;4r")  # Rows 2-4 (1-based); the cursor homes
+    assert (screen.x, screen.y) == (0, 0)
+    parser.feed(b"\x1b[4;1H\nnew")
+    assert [row(screen, y) for y in range(5)] == ["top", "2", "3", "new", "bottom"]
+    assert history(screen) == []
+
+
+def test_reverse_index_at_region_top_scrolls_down():
+    screen, parser = make(rows=5)
+    parser.feed(b"a\r\nb\r\nc\r\nd\r\ne")
+    parser.feed(b"\x1b[2;4r\x1b[2;1H\x1bM")
+    assert [row(screen, y) for y in range(5)] == ["a", "", "b", "c", "e"]
+
+
+def test_delete_lines_inside_region():
+    screen, parser = make(rows=5)
+    parser.feed(b"a\r\nb\r\nc\r\nd\r\ne")
+    parser.feed(b"\x1b[1;4r\x1b[2;1H\x1b[M")
+    assert [row(screen, y) for y in range(5)] == ["a", "c", "d", "", "e"]
+    assert history(screen) == []
+
+
+def test_alt_screen_1049_saves_and_restores_primary_and_cursor():
+    screen, parser = make()
+    parser.feed(b"shell$ \x1b[1m")
+    saved = (screen.x, screen.y)
+    parser.feed(b"\x1b[?1049h")
+    assert all(row(screen, y) == "" for y in range(screen.rows))
+    parser.feed(b"\x1b[3;3Hvim\r\n" * 6)
+    assert history(screen) == []  # The alternate screen never feeds the scrollback
+    parser.feed(b"\x1b[?1049l")
+    assert row(screen, 0) == "shell$"
+    assert (screen.x, screen.y) == saved
+    assert screen.attr & vterm.BOLD
+
+
+def test_utf8_split_across_feeds():
+    screen, parser = make()
+    data = "é€😀".encode()
+    for i in range(len(data)):
+        parser.feed(data[i:i + 1])
+    assert row(screen, 0) == "é€😀"
+
+
+def test_escape_sequence_split_across_feeds():
+    screen, parser = make()
+    for chunk in (b"\x1b", b"[3", b"1", b"mx"):
+        parser.feed(chunk)
+    text, attrs = screen.display_line(0)
+    assert text[0] == "x"
+    assert vterm.attr_fg(attrs[0]) == 1
+
+
+def test_shrinking_rows_pushes_top_into_scrollback():
+    screen, parser = make(rows=4)
+    parser.feed(b"1\r\n2\r\n3\r\n4")
+    screen.resize(2, 10)
+    assert history(screen) == ["1", "2"]
+    assert [row(screen, y) for y in range(2)] == ["3", "4"]
+    assert screen.y == 1
+
+
+def test_shrinking_rows_drops_blank_space_below_cursor_first():
+    screen, parser = make(rows=4)
+    parser.feed(b"1\r\n2")
+    screen.resize(2, 10)
+    assert history(screen) == []
+    assert [row(screen, y) for y in range(2)] == ["1", "2"]
+
+
+def test_resize_columns_keeps_scrollback_and_pads_history():
+    screen, parser = make(rows=2, cols=4)
+    parser.feed(b"aaaa\r\nbbbb\r\ncccc")
+    screen.resize(2, 6)
+    assert history(screen) == ["aaaa"]
+    text, _ = screen.display_line(0, offset=1)
+    assert text == "aaaa  "
+    parser.feed(b"\r\nddddddd")
+    assert [row(screen, y) for y in range(2)] == ["dddddd", "d"]
+
+
+def test_display_line_with_offset_mixes_history_and_screen():
+    screen, parser = make(rows=3, cols=5)
+    parser.feed(b"h1\r\nh2\r\ns1\r\ns2\r\ns3")
+    assert history(screen) == ["h1", "h2"]
+    assert [row(screen, y, offset=1) for y in range(3)] == ["h2", "s1", "s2"]
+    assert [row(screen, y, offset=2) for y in range(3)] == ["h1", "h2", "s1"]
+
+
+def test_display_line_offset_keeps_history_attributes():
+    screen, parser = make(rows=1, cols=5)
+    parser.feed(b"\x1b[32mgreen\x1b[m\r\nplain")
+    text, attrs = screen.display_line(0, offset=1)
+    assert text == "green"
+    assert vterm.attr_fg(attrs[0]) == 2
+    assert screen.display_line(0)[1] is None  # Default-attribute rows are reported as None
+
+
+def test_huge_tab_count_is_clamped_and_computed_directly():
+    screen, parser = make(cols=80)
+    start = time.monotonic()
+    parser.feed(b"\x1b[200000000I")
+    assert time.monotonic() - start < 0.5
+    assert screen.x == 79
+    parser.feed(b"\x1b[200000000Z")
+    assert screen.x == 0
+
+
+def test_tab_and_back_tab_counts():
+    screen, parser = make(cols=40)
+    parser.feed(b"\x1b[2I")
+    assert screen.x == 16
+    parser.feed(b"\x1b[1;18H\x1b[2Z")
+    assert screen.x == 8
+
+
+def test_repeat_is_capped_at_one_screen():
+    screen, parser = make(rows=3, cols=5)
+    writes = []
+    original = screen.write
+    screen.write = lambda text: (writes.append(len(text)), original(text))
+    parser.feed(b"x\x1b[999999999b")
+    assert writes[-1] == 3 * 5
+    cells = history(screen) + [row(screen, y) for y in range(3)]
+    assert "".join(cells) == "x" * 16  # The original character plus one screen of repeats
+
+
+def test_csi_parameters_are_clamped():
+    screen, parser = make()
+    parser.feed(b"\x1b[" + b"9" * 100000 + b"B")  # Longer than int() accepts as a str
+    assert screen.y == screen.rows - 1
+    assert len(parser.params) <= vterm.MAX_PARAMS_LENGTH
+    parser.feed(b"\x1b[99999999999999999999;3H")
+    assert (screen.y, screen.x) == (screen.rows - 1, 2)
+
+
+def test_unterminated_osc_string_is_capped():
+    screen, parser = make()
+    parser.feed(b"\x1b]0;" + b"t" * 100000)
+    assert len(parser.string) <= vterm.MAX_OSC_LENGTH
+    parser.feed(b"\x07ok")
+    assert screen.title == "t" * (vterm.MAX_OSC_LENGTH - 2)
+    assert row(screen, 0) == "ok"
@@ -0,0 +1,94 @@
+# tracing.py
+import json
+import os
+import threading
+import time
+from collections import Counter, deque
+
+MAX_SPANS = 4096  # Ring buffer size; the oldest spans are dropped first
+
+enabled = True
+_spans = deque(maxlen=MAX_SPANS)  # (name, start_ns, duration_ns, thread_id, attrs)
+_counters = Counter()
+_lock = threading.Lock()
+_epoch_ns = time.perf_counter_ns()
+
+
+class span:
+    """Context manager that records how long a block took.
+
+        with tracing.span("window.reparent", key=unique_id):
+            ...
+    """
+    __slots__ = ('name', 'attrs', 'start_ns')
+
+    def __init__(self, name, **attrs):
+        self.name = name
+        self.attrs = attrs
+        self.start_ns = 0
+
+    def __enter__(self):
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.attrs['error'] = exc_type.__name__
+        record(self.name, self.start_ns, time.perf_counter_ns(), **self.attrs)
+        return False
+
+
+def now_ns():
+    return time.perf_counter_ns()
+
+
+def record(name, start_ns, end_ns, **attrs):
+    """Records a span whose start and end were measured elsewhere (e.g. across callbacks)."""
+    if enabled:
+        _spans.append((name, start_ns, end_ns - start_ns, threading.get_ident(), attrs))
+
+
+def count(name, n=1):
+    if enabled:
+        with _lock:
+            _counters[name] += n
+
+
+def spans():
+    return list(_spans)
+
+
+def counters():
+    with _lock:
+        return dict(_counters)
+
+
+def reset():
+    _spans.clear()
+    with _lock:
+        _counters.clear()
+
+
+def summary():
+    """Returns {span name: (count, mean_ms, p95_ms, max_ms)} over the ring buffer."""
+    durations = {}
+    for name, _, duration_ns, _, _ in spans():
+        durations.setdefault(name, []).append(duration_ns / 1e6)
+    result = {}
+    for name, values in durations.items():
+        values.sort()
+        p95 = values[min(len(values) - 1, int(len(values) * 0.95))]
+        result[name] = (len(values), sum(values) / len(values), p95, values[-1])
+    return result
+
+
+def export_trace(path):
+    """Writes the ring buffer in Chrome trace event format (chrome://tracing, Perfetto)."""
+    pid = os.getpid()
+    events = [{"name": name, "ph": "X", "pid": pid, "tid": tid,
+               "ts": (start_ns - _epoch_ns) / 1000, "dur": duration_ns / 1000,
+               "args": {key: str(value) for key, value in attrs.items()}}
+              for name, start_ns, duration_ns, tid, attrs in spans()]
+    with open(path, 'w') as f:
+        json.dump({"traceEvents": events, "counters": counters(), "displayTimeUnit": "ms"}, f)
+    return len(events)
@@ -0,0 +1,654 @@
+# vterm.py
+import codecs
+import re
+from array import array, typecodes
+from collections import deque
+
+CHAR_TYPE = 'w' if 'w' in typecodes else 'u'  # 'u' is deprecated from Python 3.13
+
+# A cell attribute packs fg (bits 0-8), bg (bits 9-17) and flags into one int
+DEFAULT_FG = 256
+DEFAULT_BG = 257
+BOLD = 1 << 18
+UNDERLINE = 1 << 19
+REVERSE = 1 << 20
+FLAGS = BOLD | UNDERLINE | REVERSE
+DEFAULT_ATTR = DEFAULT_FG | (DEFAULT_BG << 9)
+
+# DEC special graphics, used by curses for box drawing after ESC ( 0
+DEC_GRAPHICS = str.maketrans({
+    '`': '◆', 'a': '▒', 'f': '°', 'g': '±', 'j': '┘', 'k': '┐', 'l': '┌', 'm': '└', 'n': '┼',
+    'o': '⎺', 'p': '⎻', 'q': '─', 'r': '⎼', 's': '⎽', 't': '├', 'u': '┤', 'v': '┴', 'w': '┬',
+    'x': '│', 'y': '≤', 'z': '≥', '{': 'π', '|': '≠', '}': '£', '~': '·',
+})
+
+
+def attr_fg(attr):
+    return attr & 0x1ff
+
+
+def attr_bg(attr):
+    return (attr >> 9) & 0x1ff
+
+
+def rgb_to_256(r, g, b):
+    return 16 + 36 * round(r / 255 * 5) + 6 * round(g / 255 * 5) + round(b / 255 * 5)
+
+
+class Screen:
+    """Terminal screen: one (chars, attrs) pair of arrays per row plus a bounded scrollback.
+
+    Rows that scroll off the top of the primary screen are kept in a deque of
+    at most `scrollback` lines; rows with default attributes are stored as a
+    bare string. Changed rows are collected in `dirty` for the view to redraw.
+    """
+
+    def __init__(self, rows=24, cols=80, scrollback=10000):
+        self.rows = rows
+        self.cols = cols
+        self.scrollback = deque(maxlen=scrollback)  # (text, attrs or None)
+        self.dirty = set()
+        self.title = ""
+        self.bell = False
+        self.reset()
+
+    def reset(self):
+        self.attr = DEFAULT_ATTR
+        self.blank_attrs = array('I', [DEFAULT_ATTR]) * self.cols
+        self.blank_chars = array(CHAR_TYPE, " " * self.cols)
+        self.lines = [self._blank() for _ in range(self.rows)]
+        self.x = self.y = 0
+        self.wrap_pending = False
+        self.top, self.bottom = 0, self.rows - 1
+        self.autowrap = True
+        self.insert_mode = False
+        self.origin_mode = False
+        self.cursor_visible = True
+        self.app_cursor_keys = False
+        self.bracketed_paste = False
+        self.charsets = [False, False]  # G0/G1: True when designated DEC graphics
+        self.shift_out = False
+        self.last_char = " "
+        self.saved_cursor = None
+        self.primary = None  # Primary screen lines while the alternate screen is shown
+        self.dirty.update(range(self.rows))
+
+    def _blank(self, attr=DEFAULT_ATTR):
+        return [array(CHAR_TYPE, " " * self.cols), array('I', [attr]) * self.cols]
+
+    def _erase_attr(self):
+        # Erased cells keep the current background, like xterm
+        return DEFAULT_FG | (self.attr & (0x1ff << 9))
+
+    # Text
+
+    def write(self, text):
+        if self.charsets[self.shift_out]:
+            text = text.translate(DEC_GRAPHICS)
+        cols = self.cols
+        i, n = 0, len(text)
+        while i < n:
+            if self.wrap_pending and self.autowrap:
+                self.wrap_pending = False
+                self.x = 0
+                self.linefeed()
+            chars, attrs = self.lines[self.y]
+            x = self.x
+            count = min(n - i, cols - x)
+            chunk = text[i:i + count]
+            if self.insert_mode:
+                chars[x:x] = array(CHAR_TYPE, chunk)
+                attrs[x:x] = array('I', [self.attr]) * count
+                del chars[cols:]
+                del attrs[cols:]
+            else:
+                chars[x:x + count] = array(CHAR_TYPE, chunk)
+                attrs[x:x + count] = array('I', [self.attr]) * count
+            self.dirty.add(self.y)
+            i += count
+            if x + count >= cols:
+                self.x = cols - 1
+                self.wrap_pending = True
+            else:
+                self.x = x + count
+        if text:
+            self.last_char = text[-1]
+
+    def repeat(self, count):
+        # Anything past a full screen of repeats would only be overwritten
+        self.write(self.last_char * min(count, self.rows * self.cols))
+
+    # Cursor movement
+
+    def move_to(self, row, col):
+        if self.origin_mode:
+            row += self.top
+            row = max(self.top, min(self.bottom, row))
+        self.y = max(0, min(self.rows - 1, row))
+        self.x = max(0, min(self.cols - 1, col))
+        self.wrap_pending = False
+
+    def move_by(self, rows, cols):
+        top, bottom = (self.top, self.bottom) if self.top <= self.y <= self.bottom else (0, self.rows - 1)
+        self.y = max(top, min(bottom, self.y + rows))
+        self.x = max(0, min(self.cols - 1, self.x + cols))
+        self.wrap_pending = False
+
+    def carriage_return(self):
+        self.x = 0
+        self.wrap_pending = False
+
+    def backspace(self):
+        if self.x > 0:
+            self.x -= 1
+        self.wrap_pending = False
+
+    def tab(self, count=1):
+        if count > 0:
+            self.x = min(self.cols - 1, (self.x // 8 + count) * 8)
+        self.wrap_pending = False
+
+    def back_tab(self, count=1):
+        if count > 0:
+            self.x = max(0, ((self.x - 1) // 8 - count + 1) * 8)
+        self.wrap_pending = False
+
+    def linefeed(self):
+        if self.y == self.bottom:
+            self.scroll_up(1)
+        elif self.y < self.rows - 1:
+            self.y += 1
+
+    def reverse_index(self):
+        if self.y == self.top:
+            self.scroll_down(1)
+        elif self.y > 0:
+            self.y -= 1
+
+    def save_cursor(self):
+        self.saved_cursor = (self.x, self.y, self.attr, self.wrap_pending, self.origin_mode, list(self.charsets), self.shift_out)
+
+    def restore_cursor(self):
+        if self.saved_cursor is None:
+            self.move_to(0, 0)
+            return
+        x, y, self.attr, self.wrap_pending, self.origin_mode, charsets, self.shift_out = self.saved_cursor
+        self.charsets = list(charsets)
+        self.x = min(x, self.cols - 1)
+        self.y = min(y, self.rows - 1)
+
+    # Scrolling and editing
+
+    def _store(self, line):
+        chars, attrs = line
+        if attrs == self.blank_attrs:
+            self.scrollback.append((chars.tounicode().rstrip(), None))
+        else:
+            self.scrollback.append((chars.tounicode(), array('I', attrs)))
+
+    def scroll_up(self, count=1, history=True):
+        top, bottom = self.top, self.bottom
+        count = min(count, bottom - top + 1)
+        keep = history and top == 0 and self.primary is None
+        erase_attr = self._erase_attr()
+        blank_attrs = self.blank_attrs if erase_attr == DEFAULT_ATTR else array('I', [erase_attr]) * self.cols
+        lines = self.lines
+        for _ in range(count):
+            # The row leaving the top is blanked in place and reused at the bottom
+            line = lines.pop(top)
+            if keep:
+                self._store(line)
+            line[0][:] = self.blank_chars
+            line[1][:] = blank_attrs
+            lines.insert(bottom, line)
+        if len(self.dirty) < self.rows:
+            self.dirty.update(range(top, bottom + 1))
+
+    def scroll_down(self, count=1):
+        top, bottom = self.top, self.bottom
+        count = min(count, bottom - top + 1)
+        del self.lines[bottom - count + 1:bottom + 1]
+        self.lines[top:top] = [self._blank(self._erase_attr()) for _ in range(count)]
+        self.dirty.update(range(top, bottom + 1))
+
+    def set_scroll_region(self, top, bottom):
+        top = max(0, top)
+        bottom = min(self.rows - 1, bottom)
+        if top < bottom:
+            self.top, self.bottom = top, bottom
+            self.move_to(0, 0)
+
+    def insert_lines(self, count):
+        if self.top <= self.y <= self.bottom:
+            top, self.top = self.top, self.y
+            self.scroll_down(count)
+            self.top = top
+            self.carriage_return()
+
+    def delete_lines(self, count):
+        if self.top <= self.y <= self.bottom:
+            top, self.top = self.top, self.y
+            # Deleted lines are not history, even when the region starts at the top
+            self.scroll_up(count, history=False)
+            self.top = top
+            self.carriage_return()
+
+    def _fill(self, y, start, end):
+        chars, attrs = self.lines[y]
+        count = end - start
+        if count > 0:
+            chars[start:end] = array(CHAR_TYPE, " " * count)
+            attrs[start:end] = array('I', [self._erase_attr()]) * count
+            self.dirty.add(y)
+
+    def erase_line(self, mode=0):
+        if mode == 0:
+            self._fill(self.y, self.x, self.cols)
+        elif mode == 1:
+            self._fill(self.y, 0, self.x + 1)
+        else:
+            self._fill(self.y, 0, self.cols)
+        self.wrap_pending = False
+
+    def erase_display(self, mode=0):
+        if mode == 0:
+            self.erase_line(0)
+            rows = range(self.y + 1, self.rows)
+        elif mode == 1:
+            self.erase_line(1)
+            rows = range(0, self.y)
+        elif mode == 3:
+            self.scrollback.clear()
+            return
+        else:
+            rows = range(self.rows)
+        for y in rows:
+            self._fill(y, 0, self.cols)
+
+    def insert_chars(self, count):
+        chars, attrs = self.lines[self.y]
+        count = min(count, self.cols - self.x)
+        chars[self.x:self.x] = array(CHAR_TYPE, " " * count)
+        attrs[self.x:self.x] = array('I', [self._erase_attr()]) * count
+        del chars[self.cols:]
+        del attrs[self.cols:]
+        self.dirty.add(self.y)
+        self.wrap_pending = False
+
+    def delete_chars(self, count):
+        chars, attrs = self.lines[self.y]
+        count = min(count, self.cols - self.x)
+        del chars[self.x:self.x + count]
+        del attrs[self.x:self.x + count]
+        chars.extend(" " * count)
+        attrs.extend(array('I', [self._erase_attr()]) * count)
+        self.dirty.add(self.y)
+        self.wrap_pending = False
+
+    def erase_chars(self, count):
+        self._fill(self.y, self.x, min(self.cols, self.x + count))
+        self.wrap_pending = False
+
+    # Modes
+
+    def set_alternate(self, on, save_cursor=False, clear=False):
+        if on and self.primary is None:
+            if save_cursor:
+                self.save_cursor()
+            self.primary = self.lines
+            self.lines = [self._blank() for _ in range(self.rows)]
+        elif not on and self.primary is not None:
+            self.lines = self.primary
+            self.primary = None
+            if save_cursor:
+                self.restore_cursor()
+        elif on and clear:
+            self.erase_display(2)
+        self.dirty.update(range(self.rows))
+
+    def set_mode(self, mode, private, on):
+        if not private:
+            if mode == 4:
+                self.insert_mode = on
+            return
+        if mode == 1:
+            self.app_cursor_keys = on
+        elif mode == 6:
+            self.origin_mode = on
+            self.move_to(0, 0)
+        elif mode == 7:
+            self.autowrap = on
+        elif mode == 25:
+            self.cursor_visible = on
+        elif mode in (47, 1047):
+            self.set_alternate(on)
+        elif mode == 1048:
+            self.save_cursor() if on else self.restore_cursor()
+        elif mode == 1049:
+            self.set_alternate(on, save_cursor=True, clear=True)
+        elif mode == 2004:
+            self.bracketed_paste = on
+
+    def select_graphic_rendition(self, params):
+        if not params:
+            params = [0]
+        attr = self.attr
+        i = 0
+        while i < len(params):
+            p = params[i]
+            if p == 0:
+                attr = DEFAULT_ATTR
+            elif p == 1:
+                attr |= BOLD
+            elif p == 4:
+                attr |= UNDERLINE
+            elif p == 7:
+                attr |= REVERSE
+            elif p == 22:
+                attr &= ~BOLD
+            elif p == 24:
+                attr &= ~UNDERLINE
+            elif p == 27:
+                attr &= ~REVERSE
+            elif 30 <= p <= 37 or 90 <= p <= 97:
+                attr = (attr & ~0x1ff) | (p - 30 if p < 90 else p - 82)
+            elif p == 39:
+                attr = (attr & ~0x1ff) | DEFAULT_FG
+            elif 40 <= p <= 47 or 100 <= p <= 107:
+                attr = (attr & ~(0x1ff << 9)) | ((p - 40 if p < 100 else p - 92) << 9)
+            elif p == 49:
+                attr = (attr & ~(0x1ff << 9)) | (DEFAULT_BG << 9)
+            elif p in (38, 48) and i + 1 < len(params):
+                if params[i + 1] == 5 and i + 2 < len(params):
+                    color = params[i + 2] & 0xff
+                    i += 2
+                elif params[i + 1] == 2 and i + 4 < len(params):
+                    color = rgb_to_256(*(min(255, c) for c in params[i + 2:i + 5]))
+                    i += 4
+                else:
+                    break
+                if p == 38:
+                    attr = (attr & ~0x1ff) | color
+                else:
+                    attr = (attr & ~(0x1ff << 9)) | (color << 9)
+            i += 1
+        self.attr = attr
+
+    def resize(self, rows, cols):
+        if rows == self.rows and cols == self.cols:
+            return
+        if cols != self.cols:
+            for buffer in (self.lines, self.primary or ()):
+                for chars, attrs in buffer:
+                    if cols < self.cols:
+                        del chars[cols:]
+                        del attrs[cols:]
+                    else:
+                        chars.extend(" " * (cols - self.cols))
+                        attrs.extend(array('I', [DEFAULT_ATTR]) * (cols - self.cols))
+            self.cols = cols
+            self.blank_attrs = array('I', [DEFAULT_ATTR]) * cols
+            self.blank_chars = array(CHAR_TYPE, " " * cols)
+        if rows < self.rows:
+            # Drop blank space below the cursor first, then push the top into history
+            excess = self.rows - rows
+            from_bottom = min(excess, self.rows - 1 - self.y)
+            del self.lines[self.rows - from_bottom:]
+            from_top = excess - from_bottom
+            if from_top and self.primary is None:
+                for line in self.lines[:from_top]:
+                    self._store(line)
+            del self.lines[:from_top]
+            self.y -= from_top
+            if self.primary is not None:
+                del self.primary[rows:]
+        elif rows > self.rows:
+            self.lines.extend(self._blank() for _ in range(rows - self.rows))
+            if self.primary is not None:
+                self.primary.extend(self._blank() for _ in range(rows - self.rows))
+        self.rows = rows
+        self.top, self.bottom = 0, rows - 1
+        self.x = min(self.x, cols - 1)
+        self.y = max(0, min(self.y, rows - 1))
+        self.wrap_pending = False
+        self.dirty = set(range(rows))
+
+    def display_line(self, y, offset=0):
+        """Returns (text, attrs or None) for screen row y when scrolled back by offset lines."""
+        if offset:
+            index = len(self.scrollback) - offset + y
+            if index < len(self.scrollback):
+                text, attrs = self.scrollback[index]
+                if len(text) < self.cols:
+                    text = text.ljust(self.cols)
+                    if attrs is not None:
+                        attrs = attrs + array('I', [DEFAULT_ATTR]) * (self.cols - len(attrs))
+                return text[:self.cols], attrs[:self.cols] if attrs is not None else None
+            y -= offset
+        chars, attrs = self.lines[y]
+        return chars.tounicode(), None if attrs == self.blank_attrs else attrs
+
+
+GROUND, ESCAPE, ESCAPE_CHARSET, CSI, OSC, OSC_ESCAPE, STRING, STRING_ESCAPE = range(8)
+
+# Escape sequences come from the remote side; keep what they can make the Tk thread do bounded
+MAX_PARAM = 65535  # Largest CSI parameter value
+MAX_PARAMS_LENGTH = 256  # Characters of CSI parameters kept; the rest is dropped
+MAX_OSC_LENGTH = 4096  # Characters of an OSC string (e.g. a window title) kept
+PRINTABLE = re.compile(r'[^\x00-\x1f\x7f-\x9f]+')
+
+
+class Parser:
+    """Incremental VT100/xterm escape sequence parser driving a Screen.
+
+    Bytes may be fed in arbitrary chunks; partial UTF-8 sequences and partial
+    escape sequences are carried over to the next feed(). Runs of printable
+    text are handed to the screen in one call.
+    """
+
+    def __init__(self, screen, reply=None):
+        self.screen = screen
+        self.reply = reply  # callable(str) for answers to terminal queries
+        self.decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self.state = GROUND
+        self.params = ""
+        self.intermediate = ""
+        self.string = []
+
+    def feed(self, data):
+        self.feed_text(self.decoder.decode(data))
+
+    def feed_text(self, text):
+        screen = self.screen
+        match = PRINTABLE.match
+        i, n = 0, len(text)
+        while i < n:
+            state = self.state
+            if state == GROUND:
+                m = match(text, i)
+                if m:
+                    screen.write(m.group())
+                    i = m.end()
+                    continue
+                ch = text[i]
+                i += 1
+                # Line endings dominate bulk output; skip the general dispatch for them
+                if ch == '\n':
+                    screen.linefeed()
+                elif ch == '\r':
+                    screen.carriage_return()
+                else:
+                    self._control(ch)
+                continue
+            ch = text[i]
+            i += 1
+            if state == CSI:
+                if '0' <= ch <= '?':
+                    if len(self.params) < MAX_PARAMS_LENGTH:
+                        self.params += ch
+                elif ' ' <= ch <= '/':
+                    self.intermediate += ch
+                elif '@' <= ch <= '~':
+                    self.state = GROUND
+                    self._csi(ch)
+                elif ch == '\x1b':
+                    self.state = ESCAPE
+                elif ch < ' ':
+                    self._control(ch)
+            elif state == ESCAPE:
+                self.state = GROUND
+                if ch == '[':
+                    self.state = CSI
+                    self.params = self.intermediate = ""
+                elif ch == ']':
+                    self.state = OSC
+                    self.string = []
+                elif ch in 'PX^_':
+                    self.state = STRING
+                elif ch in '()*+':
+                    self.state = ESCAPE_CHARSET
+                    self.intermediate = ch
+                elif ch in '#% ':
+                    self.state = ESCAPE_CHARSET
+                    self.intermediate = ""
+                else:
+                    self._escape(ch)
+            elif state == ESCAPE_CHARSET:
+                self.state = GROUND
+                if self.intermediate and self.intermediate in '()':
+                    screen.charsets[self.intermediate == ')'] = ch == '0'
+            elif state == OSC:
+                if ch == '\x07':
+                    self.state = GROUND
+                    self._osc()
+                elif ch == '\x1b':
+                    self.state = OSC_ESCAPE
+                elif len(self.string) < MAX_OSC_LENGTH:
+                    self.string.append(ch)
+            elif state == OSC_ESCAPE:
+                self.state = GROUND
+                self._osc()
+                if ch != '\\':
+                    i -= 1
+                    self.state = ESCAPE
+            elif state == STRING:
+                # DCS, SOS, PM and APC payloads are ignored up to the string terminator
+                if ch == '\x1b':
+                    self.state = STRING_ESCAPE
+                elif ch == '\x07':
+                    self.state = GROUND
+            elif state == STRING_ESCAPE:
+                self.state = GROUND if ch == '\\' else STRING
+
+    def _control(self, ch):
+        screen = self.screen
+        if ch == '\x1b':
+            self.state = ESCAPE
+        elif ch == '\r':
+            screen.carriage_return()
+        elif ch in '\n\x0b\x0c':
+            screen.linefeed()
+        elif ch == '\x08':
+            screen.backspace()
+        elif ch == '\t':
+            screen.tab()
+        elif ch == '\x07':
+            screen.bell = True
+        elif ch == '\x0e':
+            screen.shift_out = True
+        elif ch == '\x0f':
+            screen.shift_out = False
+
+    def _escape(self, ch):
+        screen = self.screen
+        if ch == '7':
+            screen.save_cursor()
+        elif ch == '8':
+            screen.restore_cursor()
+        elif ch == 'D':
+            screen.linefeed()
+        elif ch == 'E':
+            screen.carriage_return()
+            screen.linefeed()
+        elif ch == 'M':
+            screen.reverse_index()
+        elif ch == 'c':
+            screen.reset()
+
+    def _osc(self):
+        command, _, value = "".join(self.string).partition(';')
+        if command in ('0', '2'):
+            self.screen.title = value
+
+    def _csi(self, final):
+        screen = self.screen
+        private = self.params[:1] in ('?', '>', '<', '=')
+        marker = self.params[:1] if private else ""
+        body = self.params[1:] if private else self.params
+        params = [min(int(p), MAX_PARAM) if p.isdigit() else 0 for p in body.replace(':', ';').split(';')] if body else []
+        if self.intermediate:
+            return  # DECSCUSR and friends: nothing to do for us
+        first = params[0] if params else 0
+        count = first or 1
+
+        if final == 'm':
+            if not marker:
+                screen.select_graphic_rendition(params)
+        elif final == 'H' or final == 'f':
+            screen.move_to((first or 1) - 1, (params[1] if len(params) > 1 and params[1] else 1) - 1)
+        elif final == 'A':
+            screen.move_by(-count, 0)
+        elif final in 'Be':
+            screen.move_by(count, 0)
+        elif final in 'Ca':
+            screen.move_by(0, count)
+        elif final == 'D':
+            screen.move_by(0, -count)
+        elif final == 'E':
+            screen.move_by(count, -screen.cols)
+        elif final == 'F':
+            screen.move_by(-count, -screen.cols)
+        elif final in 'G`':
+            screen.move_to(screen.y - (screen.top if screen.origin_mode else 0), count - 1)
+        elif final == 'd':
+            screen.move_to(count - 1, screen.x)
+        elif final == 'J':
+            screen.erase_display(first)
+        elif final == 'K':
+            screen.erase_line(first)
+        elif final == 'L':
+            screen.insert_lines(count)
+        elif final == 'M':
+            screen.delete_lines(count)
+        elif final == '@':
+            screen.insert_chars(count)
+        elif final == 'P':
+            screen.delete_chars(count)
+        elif final == 'X':
+            screen.erase_chars(count)
+        elif final == 'S':
+            screen.scroll_up(count)
+        elif final == 'T' and not marker:
+            screen.scroll_down(count)
+        elif final == 'I':
+            screen.tab(count)
+        elif final == 'Z':
+            screen.back_tab(count)
+        elif final == 'b':
+            screen.repeat(count)
+        elif final == 'r':
+            screen.set_scroll_region((first or 1) - 1, (params[1] if len(params) > 1 and params[1] else screen.rows) - 1)
+        elif final == 's' and not marker:
+            screen.save_cursor()
+        elif final == 'u' and not marker:
+            screen.restore_cursor()
+        elif final in 'hl':
+            for mode in params:
+                screen.set_mode(mode, marker == '?', final == 'h')
+        elif final == 'c' and self.reply:
+            self.reply("\x1b[>0;0;0c" if marker == '>' else "\x1b[?1;2c")
+        elif final == 'n' and self.reply and not marker:
+            if first == 5:
+                self.reply("\x1b[0n")
+            elif first == 6:
+                self.reply(f"\x1b[{screen.y + 1};{screen.x + 1}R")
@@ -0,0 +1,167 @@
+# watcher.py
+import ctypes
+import ctypes.util
+import os
+import struct
+import tkinter as tk
+import connection_store
+import tracing
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE | IN_DELETE_SELF
+EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, name length
+
+BATCH_DELAY_MS = 100  # Lets a burst of writes coalesce into one tree update
+BATCH_SIZE = 500  # Files parsed per Tk callback
+POLL_INTERVAL_MS = 5000
+
+
+def _libc():
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        libc.inotify_init1, libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+class ConnectionDirWatcher:
+    """Applies .gemTerm files created, changed or deleted in a directory while gemTerm runs.
+
+    A per-file (mtime_ns, size) cache, kept by the connection store, means
+    only files whose signature changed are ever parsed, including on startup.
+    Files the store writes itself are recorded in that cache as they are
+    written, so they are not read back. inotify reports changed names; where
+    it isn't available the directory is re-stat'ed every few seconds instead.
+    Changes are applied on the Tk thread in batches and handed to
+    on_changes(upserts, removed), where upserts is a list of
+    (unique_id, connection_data) and removed a list of unique_ids.
+    """
+
+    def __init__(self, root, directory, store, on_changes, poll_interval_ms=POLL_INTERVAL_MS):
+        self.root = root
+        self.directory = directory
+        self.store = store
+        self.on_changes = on_changes
+        self.poll_interval_ms = poll_interval_ms
+        self.signatures = None  # file name -> (mtime_ns, size) of the version last applied
+        self.pending = set()  # File names to re-check
+        self.apply_id = None
+        self.poll_id = None
+        self.libc = None
+        self.fd = None
+
+    def start(self):
+        self.signatures = self.store.file_signatures()
+        if self.signatures is None:
+            # First run: the files present were just loaded (or migrated into
+            # the store), so record them without parsing anything again
+            self.store.update_file_signatures(connection_store.scan_flat_files(self.directory))
+            self.signatures = self.store.file_signatures()
+        else:
+            self.rescan()
+        if not self._start_inotify():
+            self.poll_id = self.root.after(self.poll_interval_ms, self._poll)
+
+    def _start_inotify(self):
+        self.libc = _libc()
+        if self.libc is None:
+            return False
+        fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            return False
+        if self.libc.inotify_add_watch(fd, os.fsencode(self.directory), WATCH_MASK) < 0:
+            os.close(fd)
+            return False
+        self.fd = fd
+        self.root.tk.createfilehandler(self.fd, tk.READABLE, self._on_inotify)
+        return True
+
+    def _stop_inotify(self):
+        if self.fd is not None:
+            self.root.tk.deletefilehandler(self.fd)
+            os.close(self.fd)
+            self.fd = None
+
+    def rescan(self):
+        """Queues every file whose signature differs from the cache, plus files that vanished."""
+        current = connection_store.scan_flat_files(self.directory)
+        changed = {name for name, signature in current.items() if self.signatures.get(name) != signature}
+        self.pending.update(changed)
+        # list() copies atomically; a flat-file store's writer threads share this cache
+        self.pending.update(name for name in list(self.signatures) if name not in current)
+        self._schedule(0)
+
+    def _poll(self):
+        self.poll_id = None
+        self.rescan()
+        self.poll_id = self.root.after(self.poll_interval_ms, self._poll)
+
+    def _on_inotify(self, fd, mask):
+        buffer = b""
+        try:
+            while True:
+                chunk = os.read(self.fd, 65536)
+                if not chunk:
+                    break
+                buffer += chunk
+        except BlockingIOError:
+            pass
+        offset = 0
+        rescan = lost_directory = False
+        while offset + EVENT_HEADER.size <= len(buffer):
+            _, event_mask, _, length = EVENT_HEADER.unpack_from(buffer, offset)
+            name = buffer[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].split(b"\0", 1)[0]
+            offset += EVENT_HEADER.size + length
+            if event_mask & IN_Q_OVERFLOW:
+                rescan = True
+            elif event_mask & (IN_DELETE_SELF | IN_IGNORED):
+                lost_directory = True
+            elif name.endswith(connection_store.FLAT_FILE_SUFFIX.encode()):
+                self.pending.add(os.fsdecode(name))
+        if lost_directory:
+            # The directory itself went away; poll until it is recreated
+            self._stop_inotify()
+            rescan = True
+            if self.poll_id is None:
+                self.poll_id = self.root.after(self.poll_interval_ms, self._poll)
+        if rescan:
+            self.rescan()
+        else:
+            self._schedule(BATCH_DELAY_MS)
+
+    def _schedule(self, delay_ms):
+        if self.pending and self.apply_id is None:
+            self.apply_id = self.root.after(delay_ms, self._apply)
+
+    def _apply(self):
+        self.apply_id = None
+        names = [self.pending.pop() for _ in range(min(BATCH_SIZE, len(self.pending)))]
+        with tracing.span("connections.watch", files=len(names)) as span:
+            upserts, removed, changed, gone = connection_store.read_flat_file_changes(self.directory, names, self.signatures)
+            if not self.store.file_backed:
+                if upserts:
+                    self.store.save_many(upserts)
+                for unique_id in removed:
+                    self.store.delete(unique_id)
+            if changed or gone:
+                self.store.update_file_signatures(changed, gone)
+            span.attrs['parsed'] = len(changed)
+        if upserts or removed:
+            self.on_changes(upserts, removed)
+        self._schedule(0)
+
+    def close(self):
+        for after_id in (self.apply_id, self.poll_id):
+            if after_id:
+                self.root.after_cancel(after_id)
+        self.apply_id = self.poll_id = None
+        self._stop_inotify()
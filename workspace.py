@@ -0,0 +1,49 @@
+# workspace.py
+import atexit
+import os
+import tkinter as tk
+from tkinter import ttk
+import config
+
+WORKSPACE_FILE = os.path.join(config.CONFIG_DIR, "session.json")
+
+# Same write-behind cache as the settings file, without the settings defaults
+state = config.Config(WORKSPACE_FILE, defaults={})
+atexit.register(state.flush)
+
+
+def snapshot(notebook, registry):
+    """Returns the open tabs as {'tabs': [connection ids in tab order], 'selected': index or None}."""
+    tabs = []
+    selected = None
+    current = notebook.select()
+    for tab in notebook.tabs():
+        session = registry.for_frame(notebook.nametowidget(tab))
+        if session is None or session.connection_id is None:
+            continue
+        if tab == current:
+            selected = len(tabs)
+        tabs.append(session.connection_id)
+    return {'tabs': tabs, 'selected': selected}
+
+
+def save(workspace):
+    """Stores a snapshot; returns False without touching the file if nothing changed."""
+    if state.get('tabs', []) == workspace['tabs'] and state.get('selected') == workspace['selected']:
+        return False
+    state.update(workspace)
+    return True
+
+
+def saved():
+    return {'tabs': list(state.get_list('tabs', [])), 'selected': state.get('selected')}
+
+
+class RestoreBar(ttk.Frame):
+    """Offers to reopen the previous session's tabs without blocking the window."""
+
+    def __init__(self, parent, count, on_restore, on_dismiss):
+        super().__init__(parent)
+        ttk.Label(self, text=f"Reopen {count} tab{'s' if count != 1 else ''} from the last session?").pack(side=tk.LEFT, padx=5)
+        ttk.Button(self, text="Dismiss", command=on_dismiss).pack(side=tk.RIGHT, padx=2)
+        ttk.Button(self, text="Restore", command=on_restore).pack(side=tk.RIGHT, padx=2)
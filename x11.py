@@ -0,0 +1,218 @@
+# x11.py
+import subprocess
+import tkinter as tk
+import tracing
+
+try:
+    from Xlib import X
+    from Xlib import display as xdisplay
+    from Xlib import error as xerror
+    HAVE_XLIB = True
+except ImportError:
+    HAVE_XLIB = False
+
+
+class X11Backend:
+    """In-process window management for embedded xterms.
+
+    Keeps one display connection open for the lifetime of the app and caches
+    the window id of each session once it has been found, so reparent and
+    resize calls don't have to search the window tree again. Falls back to
+    xdotool when python-xlib is not installed.
+    """
+
+    def __init__(self):
+        self.display = None
+        self.net_wm_pid = None
+        self.window_ids = {}  # session key -> xterm window id
+        self.tk_root = None
+        self.on_window_event = None
+        if HAVE_XLIB:
+            try:
+                self.display = xdisplay.Display()
+                self.net_wm_pid = self.display.intern_atom('_NET_WM_PID')
+            except Exception as e:
+                print(f"Warning: Could not open X display, falling back to xdotool: {e}")
+
+    def _window(self, wid):
+        return self.display.create_resource_object('window', int(wid))
+
+    def _checked(self, request, *args, **kwargs):
+        """Sends a request that has no reply and waits for the server; returns its XError or None.
+
+        python-xlib reports errors for such requests asynchronously, so
+        flush() alone never raises; the catcher plus a sync() round trip does.
+        """
+        catcher = xerror.CatchError()
+        request(*args, onerror=catcher, **kwargs)
+        self.display.sync()
+        return catcher.get_error()
+
+    def _search_tree(self, window, title):
+        try:
+            name = window.get_wm_name()
+            if name == title:
+                return window.id
+            children = window.query_tree().children
+        except xerror.XError:
+            return None
+        for child in children:
+            found = self._search_tree(child, title)
+            if found:
+                return found
+        return None
+
+    def find_window(self, key, title=None):
+        """Returns the window id for a session, searching only on a cache miss."""
+        wid = self.window_ids.get(key)
+        if wid:
+            return wid
+        title = title or key
+        if self.display:
+            with tracing.span("window.discover", key=key):
+                wid = self._search_tree(self.display.screen().root, title)
+        else:
+            try:
+                tracing.count("subprocess.spawn")
+                output = subprocess.check_output(["xdotool", "search", "--name", f"^{title}$"], text=True)
+                window_ids = output.strip().split('\n')
+                wid = int(window_ids[0]) if window_ids and window_ids[0] else None
+            except FileNotFoundError:
+                print("Warning: xdotool not found.")
+                wid = None
+            except subprocess.CalledProcessError:
+                wid = None
+        if wid:
+            self.window_ids[key] = wid
+        return wid
+
+    def remember(self, key, wid):
+        self.window_ids[key] = int(wid)
+
+    def _window_pid(self, window):
+        prop = window.get_full_property(self.net_wm_pid, X.AnyPropertyType)
+        return prop.value[0] if prop and len(prop.value) else None
+
+    def _search_client(self, window, pid, title):
+        try:
+            if (pid and self._window_pid(window) == pid) or (title and window.get_wm_name() == title):
+                return window.id
+            children = window.query_tree().children
+        except xerror.XError:
+            return None
+        for child in children:
+            found = self._search_client(child, pid, title)
+            if found:
+                return found
+        return None
+
+    def find_client(self, pid=None, title=None, parent_wid=None):
+        """Looks for a new session window without blocking or caching.
+
+        With parent_wid (xterm -into) the window is the child of that frame;
+        otherwise it is matched by _NET_WM_PID or by its title.
+        """
+        if self.display:
+            with tracing.span("window.discover", pid=pid):
+                if parent_wid:
+                    try:
+                        children = self._window(parent_wid).query_tree().children
+                    except xerror.XError:
+                        return None
+                    return children[-1].id if children else None
+                return self._search_client(self.display.screen().root, pid, title)
+        searches = []
+        if pid:
+            searches.append(["xdotool", "search", "--pid", str(pid)])
+        if title:
+            searches.append(["xdotool", "search", "--name", f"^{title}$"])
+        for command in searches:
+            tracing.count("subprocess.spawn")
+            try:
+                output = subprocess.check_output(command, text=True, stderr=subprocess.DEVNULL)
+            except FileNotFoundError:
+                print("Warning: xdotool not found.")
+                return None
+            except subprocess.CalledProcessError:
+                continue
+            window_ids = output.split()
+            if window_ids:
+                return int(window_ids[-1])
+        return None
+
+    def start_event_watch(self, tk_root, on_window_event):
+        """Calls on_window_event() from Tk whenever windows are created, mapped or reparented.
+
+        Returns False when only the xdotool fallback is available.
+        """
+        if not self.display:
+            return False
+        self.tk_root = tk_root
+        self.on_window_event = on_window_event
+        self.display.screen().root.change_attributes(event_mask=X.SubstructureNotifyMask)
+        self.display.flush()
+        tk_root.tk.createfilehandler(self.display.fileno(), tk.READABLE, lambda fd, mask: self.pump())
+        return True
+
+    def watch_parent(self, parent_wid):
+        """Asks for events about windows created inside one of our frames."""
+        if self.display and self.on_window_event:
+            error = self._checked(self._window(parent_wid).change_attributes, event_mask=X.SubstructureNotifyMask)
+            if error:
+                print(f"Warning: Could not watch window {parent_wid}: {error}")
+
+    def pump(self):
+        interesting = False
+        while self.display and self.display.pending_events():
+            event = self.display.next_event()
+            if event.type in (X.CreateNotify, X.MapNotify, X.ReparentNotify):
+                interesting = True
+        if interesting and self.on_window_event:
+            self.on_window_event()
+
+    def reparent(self, key, parent_wid):
+        wid = self.find_window(key)
+        if not wid:
+            return False
+        with tracing.span("window.reparent", key=key):
+            if self.display:
+                error = self._checked(self._window(wid).reparent, self._window(parent_wid), 0, 0)
+                if error:
+                    print(f"Warning: Failed to reparent window {wid}: {error}")
+                    self.forget(key)
+                    return False
+            else:
+                tracing.count("subprocess.spawn")
+                subprocess.run(["xdotool", "windowreparent", str(wid), str(parent_wid)])
+        return True
+
+    def resize(self, key, width, height):
+        wid = self.window_ids.get(key)
+        if not wid or width <= 1 or height <= 1:
+            return False
+        with tracing.span("window.resize", key=key):
+            if self.display:
+                error = self._checked(self._window(wid).configure, width=width, height=height)
+                if error:
+                    print(f"Warning: Failed to resize window {wid}: {error}")
+                    self.forget(key)
+                    return False
+            else:
+                try:
+                    tracing.count("subprocess.spawn")
+                    subprocess.run(["xdotool", "windowsize", str(wid), str(width), str(height)])
+                except FileNotFoundError:
+                    print("Warning: xdotool not found. Resizing might not work.")
+                    return False
+        return True
+
+    def forget(self, key):
+        self.window_ids.pop(key, None)
+
+    def close(self):
+        if self.display:
+            if self.tk_root is not None:
+                self.tk_root.tk.deletefilehandler(self.display.fileno())
+                self.tk_root = None
+            self.display.close()
+            self.display = None
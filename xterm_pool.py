@@ -0,0 +1,135 @@
+# xterm_pool.py
+import os
+import shutil
+import subprocess
+import tempfile
+from collections import deque
+import tracing
+
+# Waits for one command line on the FIFO, then runs it in place of itself
+WAIT_FOR_COMMAND = 'IFS= read -r cmd < "$0"; rm -f "$0"; exec /bin/sh -c "$cmd"'
+
+
+class WarmXterm:
+    __slots__ = ('title', 'process', 'fifo', 'font', 'window_id')
+
+    def __init__(self, title, process, fifo, font):
+        self.title = title
+        self.process = process
+        self.fifo = fifo
+        self.font = font
+        self.window_id = None
+
+
+class WarmXtermPool:
+    """Keeps a few idle xterms mapped and reparented into a hidden frame.
+
+    Each warm xterm runs a tiny shell blocked on a private FIFO. Claiming one
+    writes the session command into the FIFO, so a launch only has to move an
+    existing window into the new tab instead of starting and finding xterm.
+    """
+
+    def __init__(self, root, x11, embedder, holder, size, xterm_args, into=True):
+        self.root = root
+        self.x11 = x11
+        self.embedder = embedder
+        self.holder = holder  # Unmapped frame the idle xterms are parked in
+        self.size = size
+        self.xterm_args = xterm_args  # callable(title, font) -> argv without -e
+        self.into = into  # Start xterms with -into the holder frame
+        self.run_dir = tempfile.mkdtemp(prefix="gemterm-pool-")
+        self.ready = deque()
+        self.starting = []
+        self.counter = 0
+        self.latencies = {'warm': deque(maxlen=100), 'cold': deque(maxlen=100)}
+
+    def fill(self, font):
+        while len(self.ready) + len(self.starting) < self.size:
+            self._spawn(font)
+
+    def _spawn(self, font):
+        self.counter += 1
+        title = f"gemterm-warm-{os.getpid()}-{self.counter}"
+        fifo = os.path.join(self.run_dir, title)
+        os.mkfifo(fifo, 0o600)
+        holder_wid = self.holder.winfo_id()
+        args = self.xterm_args(title, font) + (["-into", str(holder_wid)] if self.into else [])
+        try:
+            tracing.count("subprocess.spawn")
+            process = subprocess.Popen(args + ["-e", "/bin/sh", "-c", WAIT_FOR_COMMAND, fifo])
+        except FileNotFoundError:
+            print("Warning: xterm not found, disabling the warm xterm pool.")
+            os.remove(fifo)
+            self.size = 0
+            return
+        entry = WarmXterm(title, process, fifo, font)
+        self.starting.append(entry)
+        self.embedder.track(title, process.pid, title, holder_wid, self.into,
+                            lambda key, entry=entry: self._parked(entry),
+                            lambda key, entry=entry: self._park_failed(entry))
+
+    def _parked(self, entry):
+        """The xterm is mapped inside the hidden holder frame and ready to claim."""
+        if entry not in self.starting:
+            return
+        entry.window_id = self.x11.window_ids.get(entry.title)
+        self.starting.remove(entry)
+        self.ready.append(entry)
+
+    def _park_failed(self, entry):
+        if entry in self.starting:
+            print(f"Warning: Warm xterm {entry.title} never mapped, discarding it.")
+            self.starting.remove(entry)
+            self._discard(entry)
+
+    def claim(self, font):
+        """Returns a ready WarmXterm using font, or None if none is available."""
+        while self.ready:
+            entry = self.ready.popleft()
+            if entry.process.poll() is None and entry.font == font:
+                self.x11.forget(entry.title)
+                return entry
+            self._discard(entry)
+        return None
+
+    def start(self, entry, command):
+        """Hands the session command to a claimed xterm; returns False if it wasn't listening."""
+        try:
+            fd = os.open(entry.fifo, os.O_WRONLY | os.O_NONBLOCK)
+        except OSError as e:
+            print(f"Warning: Warm xterm {entry.title} is not accepting commands: {e}")
+            self._discard(entry)
+            return False
+        try:
+            os.write(fd, command.replace("\n", " ").encode() + b"\n")
+        finally:
+            os.close(fd)
+        return True
+
+    def _discard(self, entry):
+        self.embedder.cancel(entry.title)
+        self.x11.forget(entry.title)
+        if entry.process.poll() is None:
+            entry.process.kill()
+            entry.process.wait()
+        if os.path.exists(entry.fifo):
+            os.remove(entry.fifo)
+
+    def processes(self):
+        return [entry.process for entry in list(self.ready) + self.starting]
+
+    def record(self, mode, seconds):
+        self.latencies[mode].append(seconds)
+
+    def latency_summary(self):
+        parts = []
+        for mode in ('warm', 'cold'):
+            samples = self.latencies[mode]
+            if samples:
+                parts.append(f"{mode} {1000 * sum(samples) / len(samples):.0f} ms (n={len(samples)})")
+        return ", ".join(parts) if parts else "no launches yet"
+
+    def close(self):
+        self.ready.clear()
+        self.starting.clear()
+        shutil.rmtree(self.run_dir, ignore_errors=True)